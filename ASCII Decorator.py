@@ -1,18 +1,26 @@
 import sublime
 import sublime_plugin
 import os
-import re
 import sys
 import traceback
 import tempfile
+import threading
+import time
+
+try:
+    import queue
+except ImportError:
+    import Queue as queue
 
 ST3 = int(sublime.version()) >= 3000
 
 if not ST3:
-    from subfiglet import SublimeFiglet, figlet_paths
+    from subfiglet import SublimeFiglet, SublimeFigletFont, FONT_INDEX, PREVIEW_CACHE
+    from pyfiglet import FigletLayout, FONT_CACHE, RENDER_CACHE
     import subcomments
 else:
-    from .subfiglet import SublimeFiglet, figlet_paths
+    from .subfiglet import SublimeFiglet, SublimeFigletFont, FONT_INDEX, PREVIEW_CACHE
+    from .pyfiglet import FigletLayout, FONT_CACHE, RENDER_CACHE
     from . import subcomments
 
 PACKAGE_LOCATION = os.path.abspath(os.path.dirname(__file__))
@@ -30,15 +38,37 @@ def calculate_indent(view, sel):
     return indent
 
 
-def remove_trailing_ws(string):
-    return re.sub(r'(?m) *$', '', string)
+def resolve_layout(width, justify, direction):
+    """
+        Resolve width, justification and direction, falling back to the settings
+    """
+
+    settings = sublime.load_settings('ASCII Decorator.sublime-settings')
+
+    if width is None:
+        width = settings.get('default_width', 80)
+        justify = settings.get('default_justify', "auto")
+        direction = settings.get('default_direction', "auto")
+
+    if justify not in ["auto", "center", "left", "right"]:
+        justify = "auto"
+
+    if direction not in ["auto", "left-to-right", "right-to-left"]:
+        direction = "auto"
+
+    return int(width), justify, direction
+
+
+def find_font_directory(font, directory=None):
+    """
+        Return the directory the font resides in, or None if it can't be found
+    """
+
+    return FONT_INDEX.find(font, directory)
 
 
 class FontPreviewGeneratorCommand(sublime_plugin.WindowCommand):
     def run(self, text = "Lorem Ipsum", use_selected_text = False):
-        # Find directory locations
-        font_locations = figlet_paths()
-
         # Verify selected text
         if use_selected_text == True:
 
@@ -68,29 +98,96 @@ class FontPreviewGeneratorCommand(sublime_plugin.WindowCommand):
                 return
 
         # Find available fonts
-        self.options = []
-        for fl in font_locations:
-            for f in os.listdir(fl):
-                pth = os.path.join(fl, f)
-                if os.path.isfile(pth):
-                    if f.endswith((".flf", ".tlf")):
-                        self.options.append((f[:-4], fl))
-
-        self.options.sort()
+        self.options = FONT_INDEX.listing()
 
+        # Open the (empty) sheet right away, fonts are streamed into it
         with tempfile.NamedTemporaryFile(mode = 'wb', delete=False, suffix='.txt') as p:
-            for font in self.options:
-                f = SublimeFiglet(
-                    font=font[0], directory=font[1], width=80,
-                    justify="auto", direction="auto"
-                )
-                p.write(("Font: %s Directory: %s\n" % (font[0], font[1])).encode("utf-8"))
-                p.write(
-                    remove_trailing_ws(f.renderText(text).replace('\r\n', '\n').replace('\r', '\n')).encode('utf-8')
-                )
-                p.write("\n\n".encode("utf-8"))
+            pass
 
-        self.window.open_file(p.name)
+        view = self.window.open_file(p.name)
+        FontPreviewGenerator(view, p.name, self.options, text).start()
+
+
+class FontPreviewGenerator(threading.Thread):
+    """
+        Render the font test sheet in a pool of worker threads and append
+        each font's section to the sheet, in font order, as soon as the
+        fonts before it are done.
+    """
+
+    workers = 4
+    refresh_interval = 0.25
+
+    def __init__(self, view, path, fonts, text):
+        threading.Thread.__init__(self)
+        self.daemon = True
+        self.view = view
+        self.path = path
+        self.fonts = fonts
+        self.text = text
+        self.sections = {}
+        self.ready = threading.Condition()
+
+    def render(self, font):
+        name, directory = font
+        header = "Font: %s Directory: %s\n" % (name, directory)
+        try:
+            f = SublimeFiglet(
+                font=name, directory=directory, width=80,
+                justify="auto", direction="auto"
+            )
+            body = f.renderText(self.text, FigletLayout(strip=True))
+        except Exception as e:
+            body = "Couldn't render font: %s" % e
+        return (header + body + "\n\n").encode('utf-8')
+
+    def work(self, tasks):
+        while True:
+            try:
+                index, font = tasks.get_nowait()
+            except queue.Empty:
+                return
+            section = self.render(font)
+            with self.ready:
+                self.sections[index] = section
+                self.ready.notify()
+
+    def run(self):
+        tasks = queue.Queue()
+        for item in enumerate(self.fonts):
+            tasks.put(item)
+
+        for i in range(min(self.workers, len(self.fonts))):
+            worker = threading.Thread(target=self.work, args=(tasks,))
+            worker.daemon = True
+            worker.start()
+
+        total = len(self.fonts)
+        last_refresh = 0
+        with open(self.path, 'ab') as p:
+            for index in range(total):
+                with self.ready:
+                    while index not in self.sections:
+                        self.ready.wait()
+                    section = self.sections.pop(index)
+                p.write(section)
+
+                if index + 1 == total or time.time() - last_refresh > self.refresh_interval:
+                    p.flush()
+                    last_refresh = time.time()
+                    self.refresh(index + 1, total)
+
+    def refresh(self, done, total):
+        def update():
+            # Reload the sheet from disk to show the fonts written so far
+            if not self.view.is_loading():
+                self.view.run_command("revert")
+            if done == total:
+                sublime.status_message("ASCII Decorator: Generated %d fonts" % total)
+            else:
+                sublime.status_message("ASCII Decorator: Generating fonts (%d/%d)" % (done, total))
+
+        sublime.set_timeout(update, 0)
 
 
 class UpdateFigletPreviewCommand(sublime_plugin.TextCommand):
@@ -123,7 +220,8 @@ class UpdateFigletPreviewCommand(sublime_plugin.TextCommand):
                     "justify": justify,
                     "direction": direction,
                     "flip": flip,
-                    "reverse": reverse
+                    "reverse": reverse,
+                    "preview": True
                 }
             )
             UpdateFigletPreviewCommand.clear_buffer()
@@ -142,6 +240,124 @@ class UpdateFigletPreviewCommand(sublime_plugin.TextCommand):
         cls.preview = None
 
 
+class FigletPreview(object):
+    """
+        Render quick panel previews off the UI thread (ST3 only).
+
+        Highlights are debounced and only the latest one is rendered: older
+        requests are dropped before they start, and a finished render is
+        only shown if its entry is still the highlighted one.  The entries
+        around it are then rendered ahead of time, within the
+        "preview_prefetch_budget", so scrolling onto them is instant.
+        Renders land in the preview cache, which is sized from the same
+        setting, where FigletCommand picks them up for the preview panel.
+    """
+
+    delay = 50
+
+    def __init__(self, view, entries):
+        self.view = view
+        self.entries = entries
+        self.highlighted = -1
+        self.generation = 0
+
+    def update(self, value, example):
+        """
+            Request a preview of the highlighted entry
+        """
+
+        self.highlighted = value
+        self.generation += 1
+        if value == -1 or example is None:
+            return
+
+        generation = self.generation
+        sublime.set_timeout_async(
+            lambda: self.render(generation, value, example),
+            self.delay
+        )
+
+    def current(self, generation, value):
+        return generation == self.generation and value == self.highlighted
+
+    def render(self, generation, value, example):
+        if not self.current(generation, value):
+            return
+
+        settings = sublime.load_settings('ASCII Decorator.sublime-settings')
+        budget = int(settings.get("preview_prefetch_budget", 1024)) * 1024
+        PREVIEW_CACHE.resize(budget)
+        spent = self.prerender(value, example)
+        sublime.set_timeout(lambda: self.show(generation, value, example), 0)
+
+        # Prefetch the neighbours, nearest first, until the user moves on
+        # or the budget is used up.
+        count = int(settings.get("preview_prefetch", 2))
+        for distance in range(1, count + 1):
+            for index in (value + distance, value - distance):
+                if not self.current(generation, value) or spent >= budget:
+                    return
+                if 0 <= index < len(self.entries):
+                    spent += self.prerender(index, example)
+
+    def prerender(self, index, example):
+        """
+            Parse the entry's font and render the example into the preview
+            cache.  Return the estimated size of the sample, plus that of
+            the font if it had to be parsed.
+        """
+
+        options = self.entries[index]
+        font = options["font"]
+        directory = find_font_directory(font, options.get("directory"))
+        if directory is None:
+            return 0
+
+        width, justify, direction = resolve_layout(
+            options.get("width"), options.get("justify"), options.get("direction")
+        )
+        try:
+            parsed = not FONT_CACHE.cached(SublimeFigletFont, font, directory)
+            f = SublimeFiglet(
+                directory=directory, font=font, width=width,
+                justify=justify, direction=direction,
+                reverse=options.get("reverse") is True,
+                flip=options.get("flip") is True,
+                renderCache=PREVIEW_CACHE
+            )
+            cost = 0
+            if parsed:
+                cost = sum(len(row) for glyph in list(f.Font.glyphs.values()) for row in glyph.rows)
+            if '\n' in example:
+                # Multi-line samples are rendered in one pass without their
+                # blank lines, as decorate_multi does.  Indented samples
+                # lose their indent there first and won't be found.
+                example = '\n'.join(line for line in example.split('\n') if line.strip())
+
+            output = f.renderText(example)
+        except Exception:
+            # Errors are reported by the figlet command itself
+            return 0
+
+        return cost + len(output)
+
+    def show(self, generation, value, example):
+        if not self.current(generation, value):
+            return
+
+        # Create output panel and set to current syntax
+        window = self.view.window()
+        if window is None:
+            return
+        view = window.get_output_panel('figlet_preview')
+        view.settings().set("draw_white_space", "none")
+        window.run_command("show_panel", {"panel": "output.figlet_preview"})
+
+        # Preview
+        UpdateFigletPreviewCommand.set_buffer(example)
+        view.run_command("update_figlet_preview", self.entries[value])
+
+
 class FigletFavoritesCommand( sublime_plugin.TextCommand ):
     def run( self, edit ):
         self.undo = False
@@ -175,6 +391,20 @@ class FigletFavoritesCommand( sublime_plugin.TextCommand ):
 
         # Prepare and show quick panel
         if len(self.fonts):
+            self.previewer = FigletPreview(
+                self.view,
+                [
+                    {
+                        "font": f.get("font"),
+                        "use_additional_indent": f.get("indent"),
+                        "width": f.get("width"),
+                        "justify": f.get("justify"),
+                        "direction": f.get("direction"),
+                        "flip": f.get("flip"),
+                        "reverse": f.get("reverse")
+                    } for f in self.fonts
+                ]
+            )
             if not ST3:
                 self.view.window().show_quick_panel(
                     [f["name"] for f in self.fonts],
@@ -192,10 +422,9 @@ class FigletFavoritesCommand( sublime_plugin.TextCommand ):
             Preview the figlet output (ST3 only)
         """
 
+        example = None
         if value != -1:
             # Find the first good selection to preview
-            example = None
-
             for selection in self.view.sel():
 
                 line_A = self.view.line( selection.a )
@@ -221,30 +450,7 @@ class FigletFavoritesCommand( sublime_plugin.TextCommand ):
                             example = self.view.substr( sublime.Region(line.begin() + len(indent), line.end()) )
                             break
 
-            if example is None:
-                return
-
-            # Create output panel and set to current syntax
-            view = self.view.window().get_output_panel('figlet_preview')
-            view.settings().set("draw_white_space", "none")
-            self.view.window().run_command("show_panel", {"panel": "output.figlet_preview"})
-
-            font = self.fonts[value]
-
-            # Preview
-            UpdateFigletPreviewCommand.set_buffer(example)
-            view.run_command(
-                "update_figlet_preview",
-                {
-                    "font": font.get("font"),
-                    "use_additional_indent": font.get("indent"),
-                    "width": font.get("width"),
-                    "justify": font.get("justify"),
-                    "direction": font.get("direction"),
-                    "flip": font.get("flip"),
-                    "reverse": font.get("reverse")
-                }
-            )
+        self.previewer.update(value, example)
 
     def apply_figlet(self, value):
         """
@@ -278,30 +484,20 @@ class FigletMenuCommand( sublime_plugin.TextCommand ):
         self.undo = False
         settings = sublime.load_settings('ASCII Decorator.sublime-settings')
 
-        # Find directory locations
-        font_locations = figlet_paths()
-
         # Find available fonts
-        self.options = []
-        for fl in font_locations:
-            for f in os.listdir(fl):
-                pth = os.path.join(fl, f)
-                if os.path.isfile(pth):
-                    if f.endswith((".flf", ".tlf")):
-                        self.options.append(f)
-
-        self.options.sort()
+        self.options = [font for font, directory in FONT_INDEX.listing()]
 
         # Prepare and show quick panel
         if len(self.options):
+            self.previewer = FigletPreview(self.view, [{"font": o} for o in self.options])
             if not ST3:
                 self.view.window().show_quick_panel(
-                    [o[:-4] for o in self.options],
+                    self.options,
                     self.apply_figlet
                 )
             else:
                 self.view.window().show_quick_panel(
-                    [o[:-4] for o in self.options],
+                    self.options,
                     self.apply_figlet,
                     on_highlight=self.preview if bool(settings.get("show_preview", False)) else None
                 )
@@ -311,30 +507,15 @@ class FigletMenuCommand( sublime_plugin.TextCommand ):
             Preview the figlet output (ST3 only)
         """
 
+        example = None
         if value != -1:
             # Find the first good selection to preview
-            sel = self.view.sel()
-            example = None
-            for s in sel:
+            for s in self.view.sel():
                 if s.size():
                     example = self.view.substr(s)
                     break
-            if example is None:
-                return
 
-            # Create output panel and set to current syntax
-            view = self.view.window().get_output_panel('figlet_preview')
-            view.settings().set("draw_white_space", "none")
-            self.view.window().run_command("show_panel", {"panel": "output.figlet_preview"})
-
-            # Preview
-            UpdateFigletPreviewCommand.set_buffer(example)
-            view.run_command(
-                "update_figlet_preview",
-                {
-                    "font": self.options[value][:-4]
-                }
-            )
+        self.previewer.update(value, example)
 
     def apply_figlet(self, value):
         """
@@ -349,7 +530,7 @@ class FigletMenuCommand( sublime_plugin.TextCommand ):
             self.view.run_command(
                 "figlet",
                 {
-                    "font": self.options[value][:-4]
+                    "font": self.options[value]
                 }
             )
 
@@ -361,6 +542,121 @@ class FigletDefaultCommand( sublime_plugin.TextCommand ):
         self.view.run_command("figlet", {"font": font})
 
 
+class FigletAutoFitCommand( sublime_plugin.TextCommand ):
+    def run(self, edit):
+        settings = sublime.load_settings('ASCII Decorator.sublime-settings')
+        fonts = settings.get('auto_fit_fonts', [])
+        if len(fonts) == 0:
+            fonts = [settings.get('ascii_decorator_font', "slant")]
+        self.view.run_command("figlet", {"font": fonts[-1], "fit_fonts": fonts, "width": None})
+
+
+class FigletLiveCommand( sublime_plugin.TextCommand ):
+    """
+        Type the text in an input panel and watch it take shape in an
+        output panel.  Keystrokes only render the characters that were
+        added or removed, see pyfiglet's LiveRender.  The text is inserted
+        and decorated when the input panel is confirmed.
+    """
+
+    def run(self, edit, font=None):
+        settings = sublime.load_settings('ASCII Decorator.sublime-settings')
+        self.font = font if font is not None else settings.get('ascii_decorator_font', "slant")
+        directory = find_font_directory(self.font)
+        if directory is None:
+            return
+
+        width, justify, direction = resolve_layout(None, None, None)
+        self.live = SublimeFiglet(
+            directory=directory, font=self.font, width=width,
+            justify=justify, direction=direction
+        ).liveRender()
+
+        # Create output panel, redrawn in full the first time
+        window = self.view.window()
+        self.panel = window.get_output_panel('figlet_live')
+        self.panel.settings().set("draw_white_space", "none")
+        self.panel.settings().set("word_wrap", False)
+        UpdateFigletLiveCommand.shown = None
+        self.change("")
+        window.run_command("show_panel", {"panel": "output.figlet_live"})
+
+        window.show_input_panel(
+            "Figlet (%s):" % self.font, "",
+            self.done, self.change, self.cancel
+        )
+
+    def change(self, text):
+        self.live.update(text)
+        rows = self.live.rows()
+        if not ST3:
+            rows = [row.decode("utf-8", "replace") for row in rows]
+        UpdateFigletLiveCommand.rows = rows
+        self.panel.run_command("update_figlet_live")
+
+    def done(self, text):
+        self.cancel()
+        if text.strip() != "":
+            self.view.run_command("figlet_live_insert", {"text": text, "font": self.font})
+
+    def cancel(self):
+        self.view.window().run_command("hide_panel", {"panel": "output.figlet_live"})
+
+
+class UpdateFigletLiveCommand(sublime_plugin.TextCommand):
+    """
+        Redraw the live panel, only rewriting the ends of the rows that
+        changed since it was last drawn
+    """
+
+    rows = None
+    shown = None
+
+    def run(self, edit):
+        rows, shown = UpdateFigletLiveCommand.rows, UpdateFigletLiveCommand.shown
+        if rows is None:
+            return
+
+        if shown is None or len(shown) != len(rows):
+            self.view.replace(edit, sublime.Region(0, self.view.size()), '\n'.join(rows))
+        else:
+            # Bottom up, so the rows above keep their positions
+            for row in range(len(rows) - 1, -1, -1):
+                old, new = shown[row], rows[row]
+                if old == new:
+                    continue
+                same = 0
+                size = min(len(old), len(new))
+                while same < size and old[same] == new[same]:
+                    same += 1
+                begin = self.view.text_point(row, 0)
+                self.view.replace(edit, sublime.Region(begin + same, begin + len(old)), new[same:])
+
+        UpdateFigletLiveCommand.shown = rows
+
+
+class FigletLiveInsertCommand(sublime_plugin.TextCommand):
+    """
+        Replace the selections with the text typed in the live panel and
+        decorate it
+    """
+
+    def run(self, edit, text, font):
+        offset = 0
+        regions = []
+        for sel in list(self.view.sel()):
+            region = sublime.Region(sel.begin() + offset, sel.end() + offset)
+            self.view.replace(edit, region, text)
+            regions.append(sublime.Region(region.begin(), region.begin() + len(text)))
+            offset += len(text) - region.size()
+
+        sel = self.view.sel()
+        sel.clear()
+        for region in regions:
+            sel.add(region)
+        self.view.run_command("figlet", {"font": font, "width": None})
+
+
 class FigletCommand( sublime_plugin.TextCommand ):
     """
         @todo Load Settings...
@@ -373,13 +669,15 @@ class FigletCommand( sublime_plugin.TextCommand ):
     def run(
         self, edit, font, directory=None,
         insert_as_comment=None, use_additional_indent=None, comment_style=None,
-        width=80, justify=None, direction=None, flip=None, reverse=None
+        width=80, justify=None, direction=None, flip=None, reverse=None,
+        fit_fonts=None, preview=False
     ):
         self.edit = edit
         newSelections = []
         self.init(
             font, directory, insert_as_comment, use_additional_indent,
-            comment_style, width, justify, direction, flip, reverse
+            comment_style, width, justify, direction, flip, reverse, fit_fonts,
+            preview
         )
 
         # Loop through user selections & decorate the selections to ASCII Art.
@@ -444,7 +742,8 @@ class FigletCommand( sublime_plugin.TextCommand ):
 
     def init(
         self, font, directory, insert_as_comment, use_additional_indent,
-        comment_style, width, justify, direction, flip, reverse
+        comment_style, width, justify, direction, flip, reverse, fit_fonts=None,
+        preview=False
     ):
         """
             Read plugin settings
@@ -466,21 +765,38 @@ class FigletCommand( sublime_plugin.TextCommand ):
         if self.comment_style is None or self.comment_style not in ["line", "block"]:
             self.comment_style = "line"
 
-        self.width = settings.get('default_width', 80) if width is None else int(width)
-
-        self.justify = settings.get('default_justify', "auto") if width is None else justify
-        if self.justify not in ["auto", "center", "left", "right"]:
-            self.justify = "auto"
-
-        self.direction = settings.get('default_direction', "auto") if width is None else direction
-        if self.direction not in ["auto", "left-to-right", "right-to-left"]:
-            self.direction = "auto"
+        self.width, self.justify, self.direction = resolve_layout(width, justify, direction)
 
         self.flip = flip if flip is not None else False
         self.reverse = reverse if reverse is not None else False
 
         self.font = font
         self.directory = directory
+        self.fit_fonts = fit_fonts
+        self.fallback = (font, directory)
+
+        # The preview panel renders through the prefetched previews
+        self.render_cache = PREVIEW_CACHE if preview else RENDER_CACHE
+
+    def fit(self, text):
+        """
+            Switch to the first of the auto-fit fonts whose rendering of text
+            fits in the width, as measured without rendering.  The given font
+            is kept if none of them fit.
+        """
+
+        for font in self.fit_fonts:
+            directory = find_font_directory(font)
+            if directory is None:
+                continue
+            f = SublimeFiglet(
+                directory=directory, font=font, width=self.width,
+                justify=self.justify, direction=self.direction
+            )
+            if f.measure(text)[0] < self.width:
+                self.font, self.directory = font, directory
+                return
+        self.font, self.directory = self.fallback
 
     def decorate_multi( self, edit, currentSelections ):
         """
@@ -488,48 +804,27 @@ class FigletCommand( sublime_plugin.TextCommand ):
             Normalize converted ASCII strings to use proper line endings and spaces/tabs.
         """
 
-        # Convert the input range to a string, this represents the original selection.
-        font_locations = figlet_paths() if self.directory is None else [self.directory]
+        originals = [self.view.substr(line) for line in currentSelections]
+        if self.fit_fonts:
+            self.fit('\n'.join(originals))
 
         # Find where the font resides
-        directory = None
-        found = False
-        for fl in font_locations:
-            pth = os.path.join(fl, self.font)
-            for ext in (".flf", ".tlf"):
-                directory = fl
-                if os.path.exists(pth + ext):
-                    found = True
-                    break
-            if found is True:
-                break
-        assert found is True
+        directory = find_font_directory(self.font, self.directory)
+        assert directory is not None
 
-        output = []
-
-        for line in currentSelections:
-            original = self.view.substr(line)
-
-            # Convert the input string to ASCII Art.
-            f = SublimeFiglet(
-                directory=directory, font=self.font, width=self.width,
-                justify=self.justify, direction=self.direction
-            )
-            line_output = f.renderText( original )
-            if self.reverse is True:
-                line_output = line_output.reverse()
-            if self.flip is True:
-                line_output = line_output.flip()
-
-            if not ST3:
-                line_output = line_output.decode("utf-8", "replace")
-            output.append(line_output)
+        # Convert the input lines to ASCII Art in one pass, one band per line.
+        f = SublimeFiglet(
+            directory=directory, font=self.font, width=self.width,
+            justify=self.justify, direction=self.direction,
+            reverse=self.reverse, flip=self.flip,
+            renderCache=self.render_cache
+        )
 
-        # Normalize line endings based on settings.
-        output = self.normalize_line_endings( '\n'.join(output) )
-        # Normalize whitespace based on settings.
+        # Bands come out reversed, flipped, indented and commented already
         totalselection = sublime.Region(currentSelections[0].begin(), currentSelections[-1].end())
-        output = self.fix_whitespace( original, output, totalselection )
+        output = f.renderText( '\n'.join(originals), self.layout( totalselection ) )
+        if not ST3:
+            output = output.decode("utf-8", "replace")
 
         self.view.replace( edit, totalselection, output )
 
@@ -543,64 +838,41 @@ class FigletCommand( sublime_plugin.TextCommand ):
 
         # Convert the input range to a string, this represents the original selection.
         original = self.view.substr( currentSelection )
-
-        font_locations = figlet_paths() if self.directory is None else [self.directory]
+        if self.fit_fonts:
+            self.fit(original)
 
         # Find where the font resides
-        directory = None
-        found = False
-        for fl in font_locations:
-            pth = os.path.join(fl, self.font)
-            for ext in (".flf", ".tlf"):
-                directory = fl
-                if os.path.exists(pth + ext):
-                    found = True
-                    break
-            if found is True:
-                break
+        directory = find_font_directory(self.font, self.directory)
 
         # Convert the input string to ASCII Art.
-        assert found is True
+        assert directory is not None
+        # The output is reversed, flipped, indented and commented as its
+        # rows are joined.
         f = SublimeFiglet(
             directory=directory, font=self.font, width=self.width,
-            justify=self.justify, direction=self.direction
+            justify=self.justify, direction=self.direction,
+            reverse=self.reverse, flip=self.flip,
+            renderCache=self.render_cache
         )
-        output = f.renderText( original )
-        if self.reverse is True:
-            output = output.reverse()
-        if self.flip is True:
-            output = output.flip()
+        output = f.renderText( original, self.layout( currentSelection ) )
 
         if not ST3:
             output = output.decode("utf-8", "replace")
 
-        # Normalize line endings based on settings.
-        output = self.normalize_line_endings( output )
-        # Normalize whitespace based on settings.
-        output = self.fix_whitespace( original, output, currentSelection )
-
         self.view.replace( edit, currentSelection, output )
 
         return sublime.Region( currentSelection.begin(), currentSelection.begin() + len(output) )
 
-    def normalize_line_endings(self, string):
-        # Sublime buffers only use '\n', but then normalize all line-endings to
-        # the appropriate ending on save.
-        string = string.replace('\r\n', '\n').replace('\r', '\n')
-        return string
-
-    def fix_whitespace(self, original, prefixed, sel):
+    def layout(self, sel):
         """
-            Determine leading whitespace and comments if desired.
+            Determine leading whitespace and comments if desired, as a
+            layout pyfiglet applies while joining the rendered rows.
+            Trailing spaces are stripped from every line.
         """
 
         # Determine the indent of the CSS rule
         indent = calculate_indent(self.view, sel)
 
-        # Strip whitespace from the prefixed version so we get it right
-        #prefixed = prefixed.strip()
-        #prefixed = re.sub(re.compile('^\s+', re.M), '', prefixed)
-
         # Get comments for current syntax if desired
         comment = ('',)
         if self.insert_as_comment:
@@ -623,16 +895,22 @@ class FigletCommand( sublime_plugin.TextCommand ):
         else:
             indent_characters = ''
 
-        # Prefix the text with desired indentation level, and comments if desired
+        # pyfiglet renders UTF-8 str on ST2, the rows are laid out in it too
+        if not ST3:
+            indent = indent.encode('utf-8')
+            comment = tuple([c.encode('utf-8') for c in comment])
+
+        # Prefix the rows with desired indentation level, and comments if desired.
+        # Sublime buffers only use '\n', and rendered rows never hold line endings.
         if len(comment) > 1:
-            prefixed = prefixed.replace('\n', '\n' + indent + indent_characters)
-            prefixed = comment[0] + '\n' + indent + indent_characters + prefixed + '\n' + indent + comment[1] + '\n'
-        else:
-            prefixed = prefixed.replace('\n', '\n' + indent + comment[0] + indent_characters)
-            prefixed = comment[0] + indent_characters + prefixed  # add needed indent for first line
-
-        match = re.search('^(\s*)', original)
-        prefix = match.groups()[0]
-        match = re.search('(\s*)\Z', original)
-        suffix = match.groups()[0]
-        return remove_trailing_ws(prefixed)
+            return FigletLayout(
+                prefix=indent + indent_characters,
+                head=comment[0], tail=indent + comment[1],
+                strip=True, endLine=True
+            )
+        # The first line is inserted after the existing indent
+        return FigletLayout(
+            first=comment[0] + indent_characters,
+            prefix=indent + comment[0] + indent_characters,
+            strip=True
+        )
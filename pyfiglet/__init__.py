@@ -3,22 +3,22 @@
 """
 Python FIGlet adaption
 """
-try:
-    import pkg_resources
-except:
-    print("Couldn't load pkg_resources")
-    pass
 try:
     PY3 = False
     from StringIO import StringIO as BytesIO
+    from string import maketrans
 except:
     PY3 = True
     from io import BytesIO
+    maketrans = str.maketrans
 import re
 import sys
 import os
-from zipfile import ZipFile, is_zipfile
-from optparse import OptionParser
+import mmap
+import struct
+import threading
+import time
+import zlib
 
 __version__ = '0.6.1dev'
 __author__ = 'Peter Waller <peter.waller@gmail.com>'
@@ -44,12 +44,17 @@ Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301, USA
 
 DEFAULT_FONT= 'standard'
 DEFAULT_MODULE = 'pyfiglet.fonts'
+BUNDLE_NAME = 'fonts.bundle'
 
 
 def figlet_format(text, font=DEFAULT_FONT, **kwargs):
     fig = Figlet(font)
     return fig.renderText(text, **kwargs)
 
+def figlet_format_many(texts, font=DEFAULT_FONT, **kwargs):
+    fig = Figlet(font)
+    return fig.renderMany(texts, **kwargs)
+
 def print_figlet(text, font=DEFAULT_FONT, **kwargs):
     print(figlet_format(text, font, **kwargs))
 
@@ -74,6 +79,485 @@ class FontError(FigletError):
     """
 
 
+class LRUDict(object):
+    """
+    Dict that remembers the order its keys were last stored in, oldest
+    first. collections.OrderedDict does this too, but it isn't in Python
+    2.6, which Sublime Text 2 embeds.
+    """
+
+    def __init__(self):
+        self.links = {}
+        # Circular doubly linked list of [prev, next, key, value] links
+        self.root = []
+        self.root[:] = [self.root, self.root, None, None]
+
+    def __len__(self):
+        return len(self.links)
+
+    def __iter__(self):
+        root = self.root
+        link = root[1]
+        while link is not root:
+            yield link[2]
+            link = link[1]
+
+    def __setitem__(self, key, value):
+        """
+        Store value under key, as the most recently stored key
+        """
+        self.pop(key)
+        root = self.root
+        last = root[0]
+        link = [last, root, key, value]
+        last[1] = root[0] = self.links[key] = link
+
+    def get(self, key, default=None):
+        link = self.links.get(key)
+        return default if link is None else link[3]
+
+    def pop(self, key, default=None):
+        link = self.links.pop(key, None)
+        if link is None:
+            return default
+        prev, next = link[0], link[1]
+        prev[1] = next
+        next[0] = prev
+        return link[3]
+
+    def popOldest(self):
+        """
+        Remove and return the (key, value) stored longest ago
+        """
+        link = self.root[1]
+        if link is self.root:
+            raise KeyError('LRUDict is empty')
+        self.pop(link[2])
+        return link[2], link[3]
+
+    def values(self):
+        return [self.links[key][3] for key in self]
+
+    def clear(self):
+        self.links.clear()
+        self.root[:] = [self.root, self.root, None, None]
+
+
+class FontCache(object):
+    """
+    Bounded, thread-safe LRU cache of parsed fonts.
+
+    Entries are keyed by font class, font name and location (module or
+    directory) and remember the modification time of the font file they
+    were parsed from, so a font edited on disk is dropped and reparsed.
+    Each callable in listeners is called with the fonts that are dropped.
+    """
+
+    def __init__(self, maxsize=32):
+        self.maxsize = maxsize
+        self.lock = threading.Lock()
+        self.fonts = LRUDict()
+        self.listeners = []
+        self.hits = self.misses = self.evictions = self.stale = 0
+
+    def load(self, cls, font, location):
+        """
+        Return a parsed font, loading it with cls(font, location) on a miss
+        """
+        key = (cls, font, location)
+        mtime = cls.getFontMTime(font, location)
+        dropped = []
+
+        with self.lock:
+            entry = self.fonts.pop(key, None)
+            if entry is not None:
+                if entry[0] == mtime:
+                    # Re-insert to mark as most recently used
+                    self.fonts[key] = entry
+                    self.hits += 1
+                    return entry[1]
+                dropped.append(entry[1])
+                self.stale += 1
+            self.misses += 1
+
+        # Parse outside of the lock so other fonts can still be served
+        fontObj = cls(font, location)
+
+        with self.lock:
+            previous = self.fonts.get(key)
+            if previous is not None:
+                dropped.append(previous[1])
+            self.fonts[key] = (mtime, fontObj)
+            while len(self.fonts) > self.maxsize:
+                dropped.append(self.fonts.popOldest()[1][1])
+                self.evictions += 1
+
+        self.notify(dropped)
+        return fontObj
+
+    def cached(self, cls, font, location):
+        """
+        Return True if load() would return the font without parsing it
+        """
+        key = (cls, font, location)
+        mtime = cls.getFontMTime(font, location)
+        with self.lock:
+            entry = self.fonts.get(key)
+            return entry is not None and entry[0] == mtime
+
+    def notify(self, dropped):
+        for fontObj in dropped:
+            for listener in self.listeners:
+                listener(fontObj)
+
+    def clear(self):
+        with self.lock:
+            dropped = [entry[1] for entry in self.fonts.values()]
+            self.fonts.clear()
+        self.notify(dropped)
+
+    def stats(self):
+        with self.lock:
+            return {
+                'size': len(self.fonts), 'maxsize': self.maxsize,
+                'hits': self.hits, 'misses': self.misses,
+                'evictions': self.evictions, 'stale': self.stale
+            }
+
+
+class RenderCache(object):
+    """
+    Bounded, thread-safe LRU cache of rendered rows.
+
+    Entries are keyed by the parsed font object, the text and the layout
+    options, and the cache is bounded by the total size in bytes of the
+    UTF-8 output the rows join into rather than by entry count. Fonts dropped from FONT_CACHE
+    are invalidated, so entries never outlive the font they came from.
+    """
+
+    def __init__(self, maxsize=1 << 20):
+        self.maxsize = maxsize
+        self.size = 0
+        self.lock = threading.Lock()
+        self.renders = LRUDict()
+        self.hits = self.misses = self.evictions = self.invalidations = 0
+
+    def get(self, key):
+        """
+        Return the cached rows for key, None on a miss
+        """
+        with self.lock:
+            entry = self.renders.pop(key, None)
+            if entry is None:
+                self.misses += 1
+                return None
+            self.renders[key] = entry
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key, rows):
+        """
+        Keep a tuple of rows, evicting the least recently used entries to
+        make room. Output larger than the whole cache isn't kept.
+        """
+        size = self.sizeOf(rows)
+        if size > self.maxsize:
+            return
+        with self.lock:
+            previous = self.renders.pop(key, None)
+            if previous is not None:
+                self.size -= previous[1]
+            self.renders[key] = (rows, size)
+            self.size += size
+            while self.size > self.maxsize:
+                self.size -= self.renders.popOldest()[1][1]
+                self.evictions += 1
+
+    @staticmethod
+    def sizeOf(rows):
+        """
+        Bytes the rows take up joined into UTF-8 output
+        """
+        output = '\n'.join(rows)
+        if not isinstance(output, bytes):
+            output = output.encode('utf-8')
+        return len(output)
+
+    def resize(self, maxsize):
+        """
+        Change the bound, evicting the least recently used entries that
+        no longer fit
+        """
+        with self.lock:
+            self.maxsize = maxsize
+            while self.size > self.maxsize:
+                self.size -= self.renders.popOldest()[1][1]
+                self.evictions += 1
+
+    def invalidate(self, fontObj):
+        """
+        Drop everything rendered with the font
+        """
+        with self.lock:
+            for key in [key for key in self.renders if key[0] is fontObj]:
+                self.size -= self.renders.pop(key)[1]
+                self.invalidations += 1
+
+    def clear(self):
+        with self.lock:
+            self.renders.clear()
+            self.size = 0
+
+    def stats(self):
+        with self.lock:
+            total = self.hits + self.misses
+            return {
+                'size': self.size, 'maxsize': self.maxsize,
+                'entries': len(self.renders),
+                'hits': self.hits, 'misses': self.misses,
+                'hitRate': float(self.hits) / total if total else 0.0,
+                'evictions': self.evictions,
+                'invalidations': self.invalidations
+            }
+
+
+class FontBundle(object):
+    """
+    Precompiled fonts packed into a single memory-mapped file.
+
+    The file starts with a table mapping each font file name to the offset
+    of its parsed glyph block, together with the size and CRC of the source
+    file it was compiled from. Fonts whose source no longer matches are
+    reported as missing so the caller falls back to parsing the FLF file.
+    Python 2 reads font files as bytes, so there only fonts whose source
+    is plain ASCII come from the bundle. Bundles are written by
+    fonts/compile_flf.py.
+
+    Layout (little endian):
+        header:  magic, version, font count
+        index:   name length, name, source size, source crc, offset, length,
+                 1 if the source is ASCII else 0
+        block:   height, baseLine, maxLength, printDirection, smushMode,
+                 glyph count, hardblank, comment, glyph table of
+                 (code, width, text offset), glyph rows joined by newlines
+
+    ASCII glyphs are stored first and loaded with the font, all others
+    are read from the map when first rendered.
+    """
+
+    MAGIC = b'FLFB'
+    VERSION = 3
+
+    _bundles = {}
+    _lock = threading.Lock()
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, 'rb') as f:
+            self.map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, version, count = struct.unpack_from('<4sII', self.map, 0)
+        if magic != self.MAGIC or version != self.VERSION:
+            raise FontError('%s is not a compatible font bundle' % path)
+
+        self.index = {}
+        pos = 12
+        for i in range(count):
+            nameLength, = struct.unpack_from('<H', self.map, pos)
+            pos += 2
+            name = self.map[pos:pos + nameLength].decode('utf-8')
+            pos += nameLength
+            self.index[name] = struct.unpack_from('<5I', self.map, pos)
+            pos += 20
+
+    @classmethod
+    def open(cls, path):
+        """
+        Return the bundle at path, reusing it until the file changes.
+        Returns None if it's missing or unreadable.
+        """
+        try:
+            mtime = os.path.getmtime(path)
+        except OSError:
+            return None
+
+        with cls._lock:
+            entry = cls._bundles.get(path)
+            if entry is not None and entry[0] == mtime:
+                return entry[1]
+            try:
+                bundle = cls(path)
+            except Exception:
+                bundle = None
+            cls._bundles[path] = (mtime, bundle)
+            return bundle
+
+    @staticmethod
+    def checksum(data):
+        return zlib.crc32(data) & 0xffffffff
+
+    def loadFont(self, font, fn, source):
+        """
+        Fill a FigletFont from its compiled block. Returns False if the font
+        isn't in the bundle or was compiled from a different source file.
+        """
+        entry = self.index.get(fn)
+        if entry is None:
+            return False
+        size, crc, offset, length, ascii = entry
+        if size != len(source) or crc != self.checksum(source):
+            return False
+
+        # The bundle holds the text Python 3 decodes, the bytes Python 2
+        # parses only match it for ASCII fonts
+        if not PY3 and not ascii:
+            return False
+
+        m = self.map
+        (height, baseLine, maxLength, printDirection,
+            smushMode, count) = struct.unpack_from('<6i', m, offset)
+        pos = offset + 24
+        hbLength, = struct.unpack_from('<H', m, pos)
+        pos += 2
+        hardBlank = self.text(pos, pos + hbLength)
+        pos += hbLength
+        commentLength, = struct.unpack_from('<I', m, pos)
+        pos += 4
+        comment = self.text(pos, pos + commentLength)
+        pos += commentLength
+        table = struct.unpack_from('<%di' % (count * 3), m, pos)
+        pos += count * 12
+
+        font.height = height
+        font.baseLine = baseLine
+        font.maxLength = maxLength
+        font.printDirection = printDirection if printDirection >= 0 else None
+        font.smushMode = smushMode
+        font.hardBlank = hardBlank
+        font.comment = comment
+        font.readTaggedChar = self.readChar
+
+        # ASCII glyphs come first and are all exactly height rows, so one
+        # split covers them. Anything after is only indexed for getChar().
+        end = offset + length
+        ascii = 0
+        while ascii < count and 32 <= table[ascii * 3] < 127:
+            ascii += 1
+        if ascii:
+            split = end if ascii == count else pos + table[ascii * 3 + 2] - 1
+            rows = self.text(pos, split).split('\n')
+            shared = {}
+            for i in range(ascii):
+                code = table[i * 3]
+                font.glyphs[code] = Glyph(
+                    rows[i * height:(i + 1) * height], table[i * 3 + 1], shared)
+
+        for i in range(ascii, count):
+            start = pos + table[i * 3 + 2]
+            stop = end if i + 1 == count else pos + table[i * 3 + 5] - 1
+            font.tagged[table[i * 3]] = (start, stop, table[i * 3 + 1])
+
+        return True
+
+    def readChar(self, entry):
+        """
+        Rows and width of a glyph that was left out by loadFont()
+        """
+        start, stop, width = entry
+        return self.text(start, stop).split('\n'), width
+
+    def text(self, start, stop):
+        """
+        Text stored in the map between two offsets, a str of the ASCII
+        font's bytes on Python 2 like reading the font file gives
+        """
+        data = self.map[start:stop]
+        return data.decode('utf-8') if PY3 else data
+
+    @classmethod
+    def packFont(cls, font):
+        """
+        Serialize a parsed FigletFont into a bundle block
+        """
+        # Parse all lazily loaded glyphs, ASCII is written first
+        for code in list(font.tagged):
+            font.getChar(code)
+        codes = sorted(font.glyphs, key=lambda c: (not 32 <= c < 127, c))
+        hardBlank = font.hardBlank.encode('utf-8')
+        comment = font.comment.encode('utf-8')
+        printDirection = font.printDirection
+        block = [
+            struct.pack(
+                '<6i', font.height, font.baseLine, font.maxLength,
+                -1 if printDirection is None else printDirection,
+                font.smushMode, len(codes)
+            ),
+            struct.pack('<H', len(hardBlank)), hardBlank,
+            struct.pack('<I', len(comment)), comment
+        ]
+
+        table = []
+        text = []
+        offset = 0
+        for code in codes:
+            glyph = font.glyphs[code]
+            rows = '\n'.join(glyph.rows).encode('utf-8')
+            table.append(struct.pack('<3i', code, glyph.width, offset))
+            text.append(rows)
+            offset += len(rows) + 1
+        block.extend(table)
+        block.append(b'\n'.join(text))
+        return b''.join(block)
+
+    @classmethod
+    def write(cls, path, fonts):
+        """
+        Write a bundle from (filename, source data, FigletFont) tuples
+        """
+        blocks = []
+        index = []
+        for fn, source, font in fonts:
+            blocks.append(cls.packFont(font))
+            try:
+                FigletFont.unpackFont(source, fn).decode('ascii')
+                ascii = 1
+            except UnicodeDecodeError:
+                ascii = 0
+            index.append((fn.encode('utf-8'), len(source), cls.checksum(source), ascii))
+
+        offset = 12 + sum(2 + len(name) + 20 for name, size, crc, ascii in index)
+        header = [struct.pack('<4sII', cls.MAGIC, cls.VERSION, len(index))]
+        for (name, size, crc, ascii), block in zip(index, blocks):
+            header.append(struct.pack('<H', len(name)) + name)
+            header.append(struct.pack('<5I', size, crc, offset, len(block), ascii))
+            offset += len(block)
+
+        with open(path, 'wb') as f:
+            f.write(b''.join(header))
+            for block in blocks:
+                f.write(block)
+
+
+class Glyph(object):
+    """
+    Rows and width of a loaded character, and the edges used to smush
+    into it (see FigletFont.getEdges), worked out the first time it's
+    smushed. Fonts keep hundreds of these so they carry no __dict__.
+
+    Most glyphs share blank and repeated rows, passing the same shared
+    dict for all the glyphs of a font keeps a single copy of each.
+    """
+
+    __slots__ = ('rows', 'width', 'edges')
+
+    def __init__(self, rows, width, shared=None):
+        if shared is not None:
+            rows = [shared.setdefault(row, row) for row in rows]
+        self.rows = tuple(rows)
+        self.width = width
+        self.edges = None
+
+
 class FigletFont(object):
     """
     This class represents the currently loaded font, including
@@ -81,18 +565,58 @@ class FigletFont(object):
     """
 
     reMagicNumber = re.compile(r'^[tf]lf2.')
-    reEndMarker = re.compile(r'(.)\s*$')
+
+    # Characters that follow ASCII in FLF 2.0 fonts, before any code tags
+    deutschChars = (196, 214, 220, 228, 246, 252, 223)
 
     def __init__(self, font=DEFAULT_FONT, module=DEFAULT_MODULE):
         self.font = font
         self.comment = ''
-        self.chars = {}
-        self.width = {}
-        self.data = self.preloadFont(font, module)
-        self.loadFont()
+        self.glyphs = {}
+        self.pairs = {}
+        self.oldPairs = {}
+        self.pairRows = {}
+        self.smushTables = {}
+        self.tagged = {}
+        self.data = None
+
+        # Prefer the precompiled bundle, fall back to parsing the font file
+        fn, data = self.readFont(font, module)
+        start = time.time()
+        bundle = self.getBundle(module)
+        if bundle is None or not bundle.loadFont(self, fn, data):
+            self.data = self.decodeFont(data, fn)
+            self.loadFont()
+
+        # Seconds spent turning the raw file into glyph tables
+        self.loadTime = time.time() - start
+
+    @classmethod
+    def getModuleDirectory(cls, module=DEFAULT_MODULE):
+        """
+        Directory of the package holding the fonts
+        """
+        if module is None or module == DEFAULT_MODULE:
+            return os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fonts')
+        __import__(module)
+        return os.path.dirname(os.path.abspath(sys.modules[module].__file__))
+
+    @classmethod
+    def getFontPath(cls, font, module=DEFAULT_MODULE):
+        """
+        Locate the font file in the module's directory
+        """
+        directory = cls.getModuleDirectory(module)
+        for extension in ('tlf', 'flf'):
+            path = os.path.join(directory, '%s.%s' % (font, extension))
+            if os.path.isfile(path):
+                return path
+
+        raise FontNotFound(font)
 
     @classmethod
     def unpackFont(cls, data, font):
+        from zipfile import ZipFile, is_zipfile
         is_file_obj = hasattr(data, 'read')
         if (is_file_obj and is_zipfile(data)) or data.startswith("PK".encode('utf-8')):
             z = None
@@ -108,156 +632,680 @@ class FigletFont(object):
         else:
             return data
 
+    @classmethod
+    def readFont(cls, font, module=DEFAULT_MODULE):
+        """
+        Read the raw (possibly zipped) font file, returns (filename, data)
+        """
+
+        path = cls.getFontPath(font, module)
+        try:
+            with open(path, 'rb') as f:
+                return os.path.basename(path), f.read()
+        except Exception as e:
+            raise FontError("couldn't open %s: %s" % (path, e))
+
+    @classmethod
+    def decodeFont(cls, data, fn):
+        data = cls.unpackFont(data, fn)
+        return data.decode('utf-8', 'replace') if PY3 else data
+
     @classmethod
     def preloadFont(cls, font, module=DEFAULT_MODULE):
         """
         Load font data if exist
         """
 
-        for extension in ('tlf', 'flf'):
-            fn = '%s.%s' % (font, extension)
-            if pkg_resources.resource_exists(module, fn):
-                data = cls.unpackFont(
-                    pkg_resources.resource_string(module, fn), fn
-                )
-                return data.decode('utf-8', 'replace') if PY3 else data
+        fn, data = cls.readFont(font, module)
+        return cls.decodeFont(data, fn)
 
-        raise FontNotFound(font)
+    @classmethod
+    def getBundle(cls, module=DEFAULT_MODULE):
+        """
+        Compiled font bundle shipped alongside the fonts, if any
+        """
+        try:
+            path = os.path.join(cls.getModuleDirectory(module), BUNDLE_NAME)
+            if os.path.isfile(path):
+                return FontBundle.open(path)
+        except Exception:
+            pass
+        return None
+
+    @classmethod
+    def getFontMTime(cls, font, module=DEFAULT_MODULE):
+        """
+        Modification time of the font file, or None if it isn't on disk
+        """
+        path = cls.getFontPath(font, module)
+        try:
+            return os.path.getmtime(path)
+        except Exception:
+            return None
+
+    @classmethod
+    def streamFont(cls, font, module=DEFAULT_MODULE):
+        """
+        Open the raw (possibly zipped) font file, returns (filename, file)
+        """
+
+        path = cls.getFontPath(font, module)
+        try:
+            return os.path.basename(path), open(path, 'rb')
+        except Exception as e:
+            raise FontError("couldn't open %s: %s" % (path, e))
+
+    @classmethod
+    def probeFont(cls, font, module=DEFAULT_MODULE):
+        """
+        Read the header and comment of a font without loading it
+        """
+        fn, f = cls.streamFont(font, module)
+        try:
+            return cls.probeStream(f, fn)
+        finally:
+            f.close()
+
+    @classmethod
+    def probeStream(cls, f, fn):
+        """
+        Read the header and comment from an open font file, stopping
+        after the comment. Returns a dict of hardBlank, height, baseLine,
+        maxLength, commentLines, printDirection, smushMode, codeTagCount
+        and comment (the comment lines joined by newlines).
+        """
+        z = None
+        try:
+            if f.read(2) == b'PK':
+                from zipfile import ZipFile
+                f.seek(0)
+                z = ZipFile(f, 'r')
+                stream = z.open(z.infolist()[0])
+            else:
+                f.seek(0)
+                stream = f
+
+            header = stream.readline()
+            if b'\r' in header.rstrip(b'\r\n'):
+                # Lone carriage returns are treated as line breaks
+                lines = (header + stream.read()).split(b'\r')
+                header = lines.pop(0)
+                readline = lambda: lines.pop(0) if lines else b''
+            else:
+                readline = stream.readline
+
+            decode = lambda line: line.decode('utf-8', 'replace') if PY3 else line
+            info = cls.parseHeader(decode(header), fn)
+            comment = [
+                decode(readline()).rstrip('\r\n') for i in range(info[4])
+            ]
+        except FigletError:
+            raise
+        except Exception as e:
+            raise FontError("couldn't read %s: %s" % (fn, e))
+        finally:
+            if z is not None:
+                z.close()
+
+        keys = ('hardBlank', 'height', 'baseLine', 'maxLength', 'commentLines',
+                'printDirection', 'smushMode', 'codeTagCount')
+        info = dict(zip(keys, info))
+        info['comment'] = '\n'.join(comment)
+        return info
 
     @classmethod
     def getFonts(cls, module=DEFAULT_MODULE):
-        list_args = module.rsplit('.', 1)
-        return [font.rsplit('.', 2)[0] for font
-                in pkg_resources.resource_listdir(*list_args)
-                if font.endswith(('.flf', '.tlf'))
-                    and cls.reMagicNumber.search(cls.unpackFont(
-                        pkg_resources.resource_stream(module, font), font).readline())]
+        fonts = []
+        for fn in sorted(os.listdir(cls.getModuleDirectory(module))):
+            if fn.endswith(('.flf', '.tlf')):
+                try:
+                    cls.probeFont(fn[:-4], module)
+                except FigletError:
+                    continue
+                fonts.append(fn[:-4])
+        return fonts
 
     @classmethod
     def infoFont(cls, font, short=False, module=DEFAULT_MODULE):
         """
         Get informations of font
         """
-        data = FigletFont.preloadFont(font, module)
+        comment = cls.probeFont(font, module)['comment']
         infos = []
-        reMagicNumber = re.compile(r'^[tf]lf2.')
         reStartMarker = re.compile(r'^(FONT|COMMENT|FONTNAME_REGISTRY|FAMILY_NAME|FOUNDRY|WEIGHT_NAME|SETWIDTH_NAME|SLANT|ADD_STYLE_NAME|PIXEL_SIZE|POINT_SIZE|RESOLUTION_X|RESOLUTION_Y|SPACING|AVERAGE_WIDTH|COMMENT|FONT_DESCENT|FONT_ASCENT|CAP_HEIGHT|X_HEIGHT|FACE_NAME|FULL_NAME|COPYRIGHT|_DEC_|DEFAULT_CHAR|NOTICE|RELATIVE_).*')
         reEndMarker = re.compile(r'^.*[@#$]$')
-        for line in  data.splitlines()[0:100]:
-            if reMagicNumber.search(line) is None \
-               and reStartMarker.search(line) is None \
+        for line in comment.splitlines():
+            if reStartMarker.search(line) is None \
                and reEndMarker.search(line) is None:
                 infos.append(line)
         return '\n'.join(infos) if not short else infos[0]
 
+    @classmethod
+    def parseHeader(cls, header, font):
+        """
+        Parse the header line of a font into (hardBlank, height, baseLine,
+        maxLength, commentLines, printDirection, fullLayout, codeTagCount)
+        """
+        header = header.rstrip('\r\n')
+        if cls.reMagicNumber.search(header) is None:
+            raise FontError('%s is not a valid figlet font' % font)
+
+        header = cls.reMagicNumber.sub('', header)
+        header = header.split()
+
+        if len(header) < 6:
+            raise FontError('malformed header for %s' % font)
+
+        hardBlank = header[0]
+        height, baseLine, maxLength, oldLayout, commentLines = map(int, header[1:6])
+        printDirection = fullLayout = codeTagCount = None
+
+        # these are all optional for backwards compat
+        if len(header) > 6: printDirection = int(header[6])
+        if len(header) > 7: fullLayout = int(header[7])
+        if len(header) > 8: codeTagCount = int(header[8])
+
+        # if the new layout style isn't available,
+        # convert old layout style. backwards compatability
+        if fullLayout is None:
+            if oldLayout == 0:
+                fullLayout = 64
+            elif oldLayout < 0:
+                fullLayout = 0
+            else:
+                fullLayout = (oldLayout & 31) | 128
+
+        return (hardBlank, height, baseLine, maxLength, commentLines,
+                printDirection, fullLayout, codeTagCount)
+
     def loadFont(self):
         """
         Parse loaded font data for the rendering engine to consume
         """
         try:
+            # Lone carriage returns are treated as line breaks
+            if '\n' not in self.data:
+                self.data = self.data.replace('\r', '\n')
+            data = self.data
+
             # Parse first line of file, the header
-            data = self.data.splitlines()
-
-            header = data.pop(0)
-            if self.reMagicNumber.search(header) is None:
-                raise FontError('%s is not a valid figlet font' % self.font)
-
-            header = self.reMagicNumber.sub('', header)
-            header = header.split()
-
-            if len(header) < 6:
-                raise FontError('malformed header for %s' % self.font)
-
-            hardBlank = header[0]
-            height, baseLine, maxLength, oldLayout, commentLines = map(int, header[1:6])
-            printDirection = fullLayout = codeTagCount = None
-
-            # these are all optional for backwards compat
-            if len(header) > 6: printDirection = int(header[6])
-            if len(header) > 7: fullLayout = int(header[7])
-            if len(header) > 8: codeTagCount = int(header[8])
-
-            # if the new layout style isn't available,
-            # convert old layout style. backwards compatability
-            if fullLayout is None:
-                if oldLayout == 0:
-                    fullLayout = 64
-                elif oldLayout < 0:
-                    fullLayout = 0
-                else:
-                    fullLayout = (oldLayout & 31) | 128
+            (hardBlank, height, baseLine, maxLength, commentLines,
+                printDirection, fullLayout, codeTagCount) = self.parseHeader(
+                    data.split('\n', 1)[0], self.font)
 
             # Some header information is stored for later, the rendering
             # engine needs to know this stuff.
             self.height = height
+            self.baseLine = baseLine
+            self.maxLength = maxLength
             self.hardBlank = hardBlank
             self.printDirection = printDirection
             self.smushMode = fullLayout
 
+            # Split off the header, comments and the ASCII characters. The
+            # rest of the file is left in one piece for indexTaggedChars().
+            # Lines are walked by index; popping from the front of the list
+            # made parsing quadratic in the size of the font.
+            count = commentLines + (127 - 32) * height
+            lines = data.split('\n', count + 1)
+            if len(lines) < count + 1:
+                raise FontError('truncated font data')
+
             # Strip out comment lines
-            for i in range(0, commentLines):
-                self.comment += data.pop(0)
+            pos = 1 + commentLines
+            self.comment = ''.join(line.rstrip('\r') for line in lines[1:pos])
 
             # Load characters
+            shared = {}
             for i in range(32, 127):
-                end = None
-                width = 0
-                chars = []
-                for j in range(0, height):
-                    line = data.pop(0)
-                    if end is None:
-                        end = self.reEndMarker.search(line).group(1)
-                        end = re.compile(re.escape(end) + r'{1,2}$')
+                chars, width = self.parseChar(lines[pos:pos + height])
+                pos += height
 
-                    line = end.sub('', line)
+                if any(chars):
+                    self.glyphs[i] = Glyph(chars, width, shared)
 
-                    if len(line) > width: width = len(line)
-                    chars.append(line)
-
-                if ''.join(chars) != '':
-                    self.chars[i] = chars
-                    self.width[i] = width
+            if len(lines) > count + 1:
+                self.indexTaggedChars(len(data) - len(lines[-1]))
 
         except Exception as e:
             raise FontError('problem parsing %s font: %s' % (self.font, e))
 
+    @staticmethod
+    def parseChar(chars):
+        """
+        Strip the end markers from the rows of a character,
+        returns the rows and the width of the character
+        """
+        chars = [line.rstrip('\r') for line in chars]
+
+        # The last non-whitespace character of the first row is the
+        # end marker, one or two of them are stripped from each row
+        end = chars[0].rstrip()[-1:] or chars[0][:1]
+        if end == '':
+            raise FontError('missing end marker')
+
+        width = 0
+        for j, line in enumerate(chars):
+            if line.endswith(end):
+                line = line[:-2] if line.endswith(end * 2) else line[:-1]
+                chars[j] = line
+            if len(line) > width: width = len(line)
+
+        return chars, width
+
+    @staticmethod
+    def parseCodeTag(tag):
+        """
+        Decode a code tag, written in decimal, octal (0 prefix)
+        or hexadecimal (0x prefix) and optionally negative
+        """
+        sign = 1
+        if tag.startswith('-'):
+            sign, tag = -1, tag[1:]
+        if tag[:2] in ('0x', '0X'):
+            return sign * int(tag[2:], 16)
+        if tag[:1] == '0' and len(tag) > 1:
+            return sign * int(tag[1:], 8)
+        return sign * int(tag)
+
+    def skipLines(self, pos, count):
+        """
+        Offset of the line count lines after pos, None past the end of data
+        """
+        data = self.data
+        for i in range(count):
+            if pos >= len(data):
+                return None
+            nl = data.find('\n', pos)
+            pos = len(data) if nl < 0 else nl + 1
+        return pos
+
+    def indexTaggedChars(self, pos):
+        """
+        Record where the Deutsch and code-tagged characters start in the
+        font data without parsing them. They are parsed by getChar() the
+        first time they are rendered, so large Unicode fonts only pay for
+        the characters that are actually used.
+        """
+        data = self.data
+        height = self.height
+
+        for code in self.deutschChars:
+            end = self.skipLines(pos, height)
+            if end is None:
+                return
+            self.tagged[code] = pos
+            pos = end
+
+        while pos < len(data):
+            nl = data.find('\n', pos)
+            if nl < 0:
+                return
+            try:
+                code = self.parseCodeTag(data[pos:nl].split(None, 1)[0])
+            except (IndexError, ValueError):
+                # Trailing garbage, nothing sensible left to index
+                return
+            end = self.skipLines(nl + 1, height)
+            if end is None:
+                return
+            if code >= 0 and code not in self.glyphs:
+                self.tagged[code] = nl + 1
+            pos = end
+
+    def readTaggedChar(self, offset):
+        """
+        Parse the character whose first row starts at offset
+        """
+        data = self.data
+        chars = []
+        for i in range(self.height):
+            nl = data.find('\n', offset)
+            if nl < 0:
+                nl = len(data)
+            chars.append(data[offset:nl])
+            offset = nl + 1
+        return self.parseChar(chars)
+
+    def getGlyph(self, code):
+        """
+        Glyph for a character code, None if the font lacks it
+        """
+        glyph = self.glyphs.get(code)
+        if glyph is None and code in self.tagged:
+            entry = self.tagged.get(code)
+            if entry is not None:
+                chars, width = self.readTaggedChar(entry)
+                if any(chars):
+                    glyph = self.glyphs[code] = Glyph(chars, width)
+                self.tagged.pop(code, None)
+        return glyph
+
+    def getChar(self, code):
+        """
+        Rows of the glyph for a character code, None if the font lacks it
+        """
+        glyph = self.getGlyph(code)
+        return glyph.rows if glyph is not None else None
+
+    def getEdges(self, code):
+        """
+        Precomputed edges of a loaded glyph, used to work out how far the
+        next character can be smushed into it. One tuple per row of:
+
+            left gap:   leading blank columns (row length if all blank)
+            left char:  first non-blank character, '' if all blank
+            right gap:  trailing blank columns after the last non-blank,
+                        counted from the first column if all blank and
+                        -1 for an empty row
+            right char: last non-blank character, the first character if
+                        all blank and '' for an empty row
+        """
+        glyph = self.glyphs[code]
+        edges = glyph.edges
+        if edges is None:
+            edges = []
+            for line in glyph.rows:
+                lgap = len(line) - len(line.lstrip())
+                lch = line[lgap] if lgap < len(line) else ''
+                linebd = max(len(line.rstrip()) - 1, 0)
+                if linebd < len(line):
+                    rgap, rch = len(line) - 1 - linebd, line[linebd]
+                else:
+                    rgap, rch = -1, ''
+                edges.append((lgap, lch, rgap, rch))
+            edges = glyph.edges = tuple(edges)
+        return edges
+
     def __str__(self):
         return '<FigletFont object: %s>' % self.font
 
 
+FONT_CACHE = FontCache()
+RENDER_CACHE = RenderCache()
+FONT_CACHE.listeners.append(RENDER_CACHE.invalidate)
+
+
 class FigletString(str):
     """
     Rendered figlet font
     """
 
-    # translation map for reversing ascii art / -> \, etc.
-    __reverse_map__ = '\x00\x01\x02\x03\x04\x05\x06\x07\x08\t\n\x0b\x0c\r\x0e\x0f\x10\x11\x12\x13\x14\x15\x16\x17\x18\x19\x1a\x1b\x1c\x1d\x1e\x1f !"#$%&\')(*+,-.\\0123456789:;>=<?@ABCDEFGHIJKLMNOPQRSTUVWXYZ]/[^_`abcdefghijklmnopqrstuvwxyz}|{~\x7f\x80\x81\x82\x83\x84\x85\x86\x87\x88\x89\x8a\x8b\x8c\x8d\x8e\x8f\x90\x91\x92\x93\x94\x95\x96\x97\x98\x99\x9a\x9b\x9c\x9d\x9e\x9f\xa0\xa1\xa2\xa3\xa4\xa5\xa6\xa7\xa8\xa9\xaa\xab\xac\xad\xae\xaf\xb0\xb1\xb2\xb3\xb4\xb5\xb6\xb7\xb8\xb9\xba\xbb\xbc\xbd\xbe\xbf\xc0\xc1\xc2\xc3\xc4\xc5\xc6\xc7\xc8\xc9\xca\xcb\xcc\xcd\xce\xcf\xd0\xd1\xd2\xd3\xd4\xd5\xd6\xd7\xd8\xd9\xda\xdb\xdc\xdd\xde\xdf\xe0\xe1\xe2\xe3\xe4\xe5\xe6\xe7\xe8\xe9\xea\xeb\xec\xed\xee\xef\xf0\xf1\xf2\xf3\xf4\xf5\xf6\xf7\xf8\xf9\xfa\xfb\xfc\xfd\xfe\xff'
-
-    # translation map for flipping ascii art ^ -> v, etc.
-    __flip_map__ = '\x00\x01\x02\x03\x04\x05\x06\x07\x08\t\n\x0b\x0c\r\x0e\x0f\x10\x11\x12\x13\x14\x15\x16\x17\x18\x19\x1a\x1b\x1c\x1d\x1e\x1f !"#$%&\'()*+,-.\\0123456789:;<=>?@VBCDEFGHIJKLWNObQbSTUAMXYZ[/]v-`aPcdefghijklwnopqrstu^mxyz{|}~\x7f\x80\x81\x82\x83\x84\x85\x86\x87\x88\x89\x8a\x8b\x8c\x8d\x8e\x8f\x90\x91\x92\x93\x94\x95\x96\x97\x98\x99\x9a\x9b\x9c\x9d\x9e\x9f\xa0\xa1\xa2\xa3\xa4\xa5\xa6\xa7\xa8\xa9\xaa\xab\xac\xad\xae\xaf\xb0\xb1\xb2\xb3\xb4\xb5\xb6\xb7\xb8\xb9\xba\xbb\xbc\xbd\xbe\xbf\xc0\xc1\xc2\xc3\xc4\xc5\xc6\xc7\xc8\xc9\xca\xcb\xcc\xcd\xce\xcf\xd0\xd1\xd2\xd3\xd4\xd5\xd6\xd7\xd8\xd9\xda\xdb\xdc\xdd\xde\xdf\xe0\xe1\xe2\xe3\xe4\xe5\xe6\xe7\xe8\xe9\xea\xeb\xec\xed\xee\xef\xf0\xf1\xf2\xf3\xf4\xf5\xf6\xf7\xf8\xf9\xfa\xfb\xfc\xfd\xfe\xff'
+    # characters swapped when reversing ascii art / -> \, etc.
+    # and when flipping it ^ -> v, etc.
+    reverseChars = ('()/<>[\\]{}', ')(\\><]/[}{')
+    flipChars = ('/AMPRVW\\^_bmvw', '\\VWbbAM/v-Pw^m')
 
     def reverse(self):
-        out = []
-        for row in self.splitlines():
-            out.append(row.translate(self.__reverse_map__)[::-1])
-
-        return self.newFromList(out)
+        return self.transform(reverse=True)
 
     def flip(self):
-        out = []
-        for row in self.splitlines()[::-1]:
-            out.append(row.translate(self.__flip_map__))
+        return self.transform(flip=True)
+
+    def transform(self, reverse=False, flip=False):
+        """
+        Reverse and/or flip the output, same as reverse() then flip()
+        but in one pass
+        """
+        return self.newFromList([self.transformText('\n'.join(self.splitlines()), reverse, flip)])
+
+    @classmethod
+    def transformText(cls, text, reverse=False, flip=False):
+        """
+        Reverse and/or flip the rows of text, with one translation
+        """
+        if not reverse and not flip:
+            return text
+        text = text.translate(cls.__transforms__[reverse, flip])
+        if reverse and flip:
+            # Reversing the whole text mirrors each row and turns the
+            # rows upside down
+            return text[::-1]
+        rows = text.split('\n')
+        if reverse:
+            return '\n'.join([row[::-1] for row in rows])
+        rows.reverse()
+        return '\n'.join(rows)
+
+    @staticmethod
+    def makeTransform(*maps):
+        """
+        Translation table applying each (source, target) map in turn
+        """
+        source = ''.join(sorted(set(''.join([m[0] for m in maps]))))
+        target = []
+        for c in source:
+            for m in maps:
+                i = m[0].find(c)
+                if i >= 0:
+                    c = m[1][i]
+            target.append(c)
+        return maketrans(source, ''.join(target))
 
-        return self.newFromList(out)
+    @classmethod
+    def rowTransform(cls, hardBlank, reverse=False, flip=False):
+        """
+        Translation table replacing hardblanks and applying the character
+        maps of a transform, for finishing rows in one pass
+        """
+        key = (hardBlank, reverse, flip)
+        table = cls.__rowTransforms__.get(key)
+        if table is None:
+            maps = [(hardBlank, ' ')]
+            if reverse:
+                maps.append(cls.reverseChars)
+            if flip:
+                maps.append(cls.flipChars)
+            table = cls.__rowTransforms__[key] = cls.makeTransform(*maps)
+        return table
 
     def newFromList(self, list):
         return FigletString('\n'.join(list) + '\n')
 
 
+FigletString.__transforms__ = {
+    (True, False): FigletString.makeTransform(FigletString.reverseChars),
+    (False, True): FigletString.makeTransform(FigletString.flipChars),
+    (True, True): FigletString.makeTransform(FigletString.reverseChars, FigletString.flipChars),
+}
+FigletString.__rowTransforms__ = {}
+
+
+class FigletLayout(object):
+    """
+    How the rows of a render are laid out in the final text: the prefix
+    of the first row and of the others, lines put before and after the
+    rows, whether trailing spaces are stripped from every line and
+    whether the text ends with a newline.
+
+    The rows are put together in one pass and joined once, rather than
+    running replaces and regexes over the whole output.
+    """
+
+    def __init__(self, prefix='', first=None, head=None, tail=None,
+                 strip=False, endLine=False):
+        self.prefix = prefix
+        self.first = prefix if first is None else first
+        self.head = head
+        self.tail = tail
+        self.strip = strip
+        self.endLine = endLine
+
+    def key(self):
+        return (self.prefix, self.first, self.head, self.tail, self.strip, self.endLine)
+
+    def __eq__(self, other):
+        return isinstance(other, FigletLayout) and self.key() == other.key()
+
+    def __ne__(self, other):
+        return not self == other
+
+    def __hash__(self):
+        return hash(self.key())
+
+    def join(self, rows):
+        """
+        Lay out a list of rendered rows, returns the text
+        """
+        strip = self.strip
+        lines = []
+        if self.head is not None:
+            lines.append(self.head.rstrip(' ') if strip else self.head)
+
+        prefix = self.first
+        for row in rows:
+            if strip:
+                row = row.rstrip(' ')
+                lines.append(prefix + row if row else prefix.rstrip(' '))
+            else:
+                lines.append(prefix + row)
+            prefix = self.prefix
+
+        if self.tail is not None:
+            lines.append(self.tail.rstrip(' ') if strip else self.tail)
+        if self.endLine:
+            lines.append('')
+        return '\n'.join(lines)
+
+
+class FigletBand(object):
+    """
+    One band of output, a row of rendered characters, being built by
+    the rendering engine
+    """
+
+    def __init__(self, height):
+        # Rows are lists of characters, joined once at the end. Appending
+        # to a string per smushed cell made long renders quadratic.
+        self.buffer = [[] for i in range(height)]
+
+        # Index of the last non-blank character of each row, -1 if blank
+        self.edges = [-1 for i in range(height)]
+
+        # Codes of the characters added, the last one, how far it was
+        # smushed into the band and its width
+        self.codes = []
+        self.prev = self.prevSmush = None
+        self.prevCharWidth = 0
+
+        # Checkpoints of the characters added, if the band is being typed
+        # into, see FigletRenderingEngine.removeCode
+        self.history = None
+
+    def width(self):
+        return max(len(line) for line in self.buffer) if self.buffer else 0
+
+
+class RenderContext(object):
+    """
+    Options and state of a single render call.
+
+    The options are read from the Figlet once, when the call starts, and
+    the widths of the characters being smushed change as it goes along.
+    Keeping them here rather than on the engine lets any number of
+    threads render with the same Figlet, engine and font at once.
+    """
+
+    def __init__(self, base):
+        self.font = base.Font
+        self.direction = base.direction
+        self.rtl = self.direction == 'right-to-left'
+        self.justify = base.justify
+        self.width = base.width
+        self.reverse = base.reverse
+        self.flip = base.flip
+        self.smushTable = None
+        self.curCharWidth = self.prevCharWidth = 0
+        self.pairHits = self.pairMisses = 0
+
+
+class LiveRender(object):
+    """
+    Text rendered as it is typed.
+
+    Every character added leaves a checkpoint of the columns it rewrote
+    in its band, so append() only renders the new characters and
+    backspace() puts the band back as it was before the last one. Bands
+    of lines that are done are finished once and kept.
+    """
+
+    def __init__(self, engine, text=''):
+        self.engine = engine
+        self.ctx = engine.newContext()
+        self.chars = []
+        self.finished = []
+        self.band = self.newBand()
+        self.append(text)
+
+    def newBand(self):
+        band = FigletBand(self.ctx.font.height)
+        band.history = []
+        return band
+
+    def getText(self):
+        return ''.join(self.chars)
+
+    def append(self, chars):
+        """
+        Add characters to the end of the text
+        """
+        for ch in chars:
+            if ch == '\n':
+                self.finished.append((self.band, self.engine.bandRows(self.ctx, self.band)))
+                self.band = self.newBand()
+            else:
+                self.engine.addCode(self.ctx, self.band, ord(ch))
+            self.chars.append(ch)
+
+    def backspace(self, count=1):
+        """
+        Remove count characters from the end of the text
+        """
+        for i in range(0, min(count, len(self.chars))):
+            if self.chars.pop() == '\n':
+                self.band = self.finished.pop()[0]
+            else:
+                self.engine.removeCode(self.ctx, self.band)
+
+    def update(self, text):
+        """
+        Change the text to text, backspacing to the part both have in
+        common and appending the rest
+        """
+        same = 0
+        size = min(len(self.chars), len(text))
+        while same < size and self.chars[same] == text[same]:
+            same += 1
+        self.backspace(len(self.chars) - same)
+        self.append(text[same:])
+
+    def rows(self):
+        """
+        Finished rows of the whole text
+        """
+        rows = []
+        for band, bandRows in self.finished:
+            rows.extend(bandRows)
+        rows.extend(self.engine.bandRows(self.ctx, self.band))
+        return rows
+
+    def render(self, layout=None):
+        """
+        The text as renderText would return it
+        """
+        if layout is None:
+            return FigletString('\n'.join(self.rows()))
+        return layout.join(self.rows())
+
+
 class FigletRenderingEngine(object):
     """
     This class handles the rendering of a FigletFont,
-    including smushing/kerning/justification/direction
+    including smushing/kerning/justification/direction.
+
+    Nothing about a render is kept on the engine, each call works on a
+    RenderContext of its own, so an engine can be used from several
+    threads at once.
     """
 
     def __init__(self, base=None):
@@ -273,50 +1321,88 @@ class FigletRenderingEngine(object):
         self.SM_KERN = 64
         self.SM_SMUSH = 128
 
+        # Glyph pair cache instrumentation, see pairStats()
+        self.pairHits = self.pairMisses = 0
+        self.lock = threading.Lock()
+
+    # Glyph pairs cached per font before the pair cache starts a new
+    # generation, see storePair()
+    maxPairs = 4096
 
-    def smushChars(self, left='', right=''):
+    def newContext(self):
         """
-        Given 2 characters which represent the edges rendered figlet
-        fonts where they would touch, see if they can be smushed together.
-        Returns None if this cannot or should not be done.
+        Start a render with the Figlet's current options
+        """
+        ctx = RenderContext(self.base)
+        ctx.smushTable = self.getSmushTable(ctx)
+        return ctx
+
+    def endContext(self, ctx):
+        """
+        Add the pair cache statistics of a finished render to the engine's
+        """
+        with self.lock:
+            self.pairHits += ctx.pairHits
+            self.pairMisses += ctx.pairMisses
+
+    def getSmushTable(self, ctx):
+        """
+        Pair table for the render's font and direction, mapping a (left,
+        right) pair to the smushed character or None. Pairs are added by
+        smushChars() the first time they're smushed, and the table is
+        kept on the font so it goes when the font is dropped.
+        """
+        table = ctx.font.smushTables.get(ctx.direction)
+        if table is None:
+            table = ctx.font.smushTables.setdefault(ctx.direction, {})
+        return table
+
+    def smushPair(self, key, left, right):
+        """
+        Table entry for 2 characters, see smushRule()
         """
         if left.isspace() is True: return right
         if right.isspace() is True: return left
+        return self.smushRule(key, left, right)
 
-        # Disallows overlapping if previous or current char has a width of 1 or zero
-        if (self.prevCharWidth < 2) or (self.curCharWidth < 2): return
+    def smushRule(self, key, left, right):
+        """
+        Apply the smushing rules of a (smushMode, hardBlank, direction)
+        to 2 characters that aren't blank
+        """
+        smushMode, hardBlank, direction = key
 
         # kerning only
-        if (self.base.Font.smushMode & self.SM_SMUSH) == 0: return
+        if (smushMode & self.SM_SMUSH) == 0: return
 
         # smushing by universal overlapping
-        if (self.base.Font.smushMode & 63) == 0:
+        if (smushMode & 63) == 0:
             # Ensure preference to visiable characters.
-            if left == self.base.Font.hardBlank: return right
-            if right == self.base.Font.hardBlank: return left
+            if left == hardBlank: return right
+            if right == hardBlank: return left
 
             # Ensures that the dominant (foreground)
             # fig-character for overlapping is the latter in the
             # user's text, not necessarily the rightmost character.
-            if self.base.direction == 'right-to-left': return left
+            if direction == 'right-to-left': return left
             else: return right
 
-        if self.base.Font.smushMode & self.SM_HARDBLANK:
-            if left == self.base.Font.hardBlank and right == self.base.Font.hardBlank:
+        if smushMode & self.SM_HARDBLANK:
+            if left == hardBlank and right == hardBlank:
                 return left
 
-        if left == self.base.Font.hardBlank or right == self.base.Font.hardBlank:
+        if left == hardBlank or right == hardBlank:
             return
 
-        if self.base.Font.smushMode & self.SM_EQUAL:
+        if smushMode & self.SM_EQUAL:
             if left == right:
                 return left
 
-        if self.base.Font.smushMode & self.SM_LOWLINE:
+        if smushMode & self.SM_LOWLINE:
             if (left  == '_') and (right in r'|/\[]{}()<>'): return right
             if (right == '_') and (left  in r'|/\[]{}()<>'): return left
 
-        if self.base.Font.smushMode & self.SM_HIERARCHY:
+        if smushMode & self.SM_HIERARCHY:
             if (left  == '|')   and (right in r'|/\[]{}()<>'): return right
             if (right == '|')   and (left  in r'|/\[]{}()<>'): return left
             if (left  in r'\/') and (right in '[]{}()<>'): return right
@@ -328,57 +1414,78 @@ class FigletRenderingEngine(object):
             if (left  in '()')  and (right in '<>'): return right
             if (right in '()')  and (left  in '<>'): return left
 
-        if self.base.Font.smushMode & self.SM_PAIR:
+        if smushMode & self.SM_PAIR:
             for pair in [left+right, right+left]:
                 if pair in ['[]', '{}', '()']: return '|'
 
-        if self.base.Font.smushMode & self.SM_BIGX:
+        if smushMode & self.SM_BIGX:
             if (left == '/') and (right == '\\'): return '|'
             if (right == '/') and (left == '\\'): return 'Y'
             if (left == '>') and (right == '<'): return 'X'
 
         return
 
-    def smushAmount(self, left=None, right=None, buffer=[], curChar=[]):
+    def smushChars(self, ctx, left='', right=''):
         """
-        Calculate the amount of smushing we can do between this char and the last
-        If this is the first char it will throw a series of exceptions which
-        are caught and cause appropriate values to be set for later.
-
-        This differs from C figlet which will just get bogus values from
-        memory and then discard them after.
+        Given 2 characters which represent the edges rendered figlet
+        fonts where they would touch, see if they can be smushed together.
+        Returns None if this cannot or should not be done.
         """
-        if (self.base.Font.smushMode & (self.SM_SMUSH | self.SM_KERN)) == 0: return 0
-
-        maxSmush = self.curCharWidth
-        for row in range(0, self.base.Font.height):
-            lineLeft = buffer[row]
-            lineRight = curChar[row]
-            if self.base.direction == 'right-to-left':
-                lineLeft, lineRight = lineRight, lineLeft
-
-            linebd = len(lineLeft.rstrip()) - 1
-            if linebd < 0:
-                linebd = 0
+        # Disallows overlapping if previous or current char has a width of 1 or zero
+        if (ctx.prevCharWidth < 2) or (ctx.curCharWidth < 2):
+            if left.isspace() is True: return right
+            if right.isspace() is True: return left
+            return
 
-            if linebd < len(lineLeft):
-                ch1 = lineLeft[linebd]
-            else:
-                linebd = 0
-                ch1 = ''
+        try:
+            return ctx.smushTable[(left, right)]
+        except KeyError:
+            smushed = ctx.smushTable[(left, right)] = self.smushPair(
+                (ctx.font.smushMode, ctx.font.hardBlank, ctx.direction),
+                left, right
+            )
+            return smushed
+
+    def smushAmount(self, ctx, buffer=[], edges=[], charEdges=[]):
+        """
+        Calculate the amount of smushing we can do between this char and the last
 
-            charbd = len(lineRight) - len(lineRight.lstrip())
-            if charbd < len(lineRight):
-                ch2 = lineRight[charbd]
+        The glyph's side of each row comes from its precomputed edges (see
+        FigletFont.getEdges) and the buffer's side from the edge index kept
+        by render(), so this costs O(height) however long the buffer is.
+        """
+        if (ctx.font.smushMode & (self.SM_SMUSH | self.SM_KERN)) == 0: return 0
+
+        rtl = ctx.rtl
+        maxSmush = ctx.curCharWidth
+        for row in range(0, ctx.font.height):
+            # gaps are the blank columns between the touching edges, chars
+            # are the characters that would touch: ch1 on the left side and
+            # ch2 on the right side
+            lgap, ch2, rgap, ch1 = charEdges[row]
+            line = buffer[row]
+            edge = edges[row]
+
+            # edge is the buffer's last non-blank, which is its first one
+            # for right-to-left as those rows are stored reversed
+            if rtl:
+                if edge < 0:
+                    lgap, ch2 = len(line), ''
+                else:
+                    lgap, ch2 = len(line) - 1 - edge, line[edge]
             else:
-                charbd = len(lineRight)
-                ch2 = ''
+                if edge >= 0:
+                    rgap, ch1 = len(line) - 1 - edge, line[edge]
+                elif line:
+                    rgap, ch1 = len(line) - 1, line[0]
+                else:
+                    rgap, ch1 = -1, ''
 
-            amt = charbd + len(lineLeft) - 1 - linebd
+            amt = lgap + rgap
 
             if ch1 == '' or ch1 == ' ':
                 amt += 1
-            elif ch2 != '' and self.smushChars(left=ch1, right=ch2) is not None:
+            elif ch2 != '' and self.smushChars(ctx, left=ch1, right=ch2) is not None:
                 amt += 1
 
             if amt < maxSmush:
@@ -386,65 +1493,882 @@ class FigletRenderingEngine(object):
 
         return maxSmush
 
-    def render(self, text):
+    def addChar(self, ctx, buffer, edges, curChar, charEdges, maxSmush, tails=None):
         """
-        Render an ASCII text string in figlet
+        Add a character to the buffer, smushing maxSmush columns of each
+        row into the end of the buffer's row, and update the index of each
+        row's last non-blank character in edges.
+
+        Right-to-left rows are stored reversed, so in both directions the
+        character is added at the end of the list and only the columns it
+        touches are rewritten. If tails is a list, it gets the rewritten
+        end of each row and the index of its last non-blank, for the pair
+        cache.
         """
-        self.curCharWidth = self.prevCharWidth = 0
-        buffer = ['' for i in range(self.base.Font.height)]
+        if (ctx.prevCharWidth < 2) or (ctx.curCharWidth < 2):
+            table = {}
+        else:
+            table = ctx.smushTable
+        smushChars = self.smushChars
+        rtl = ctx.rtl
+
+        for row in range(0, len(buffer)):
+            line = buffer[row]
+            glyph = curChar[row]
+            size = len(line)
+            width = len(glyph)
+            start = size - maxSmush
+            if start < 0: start = 0
+
+            # Overlapping columns pair the buffer's cell with the
+            # character's, cells are kept on the side the original
+            # left-to-right row builder kept them: the buffer's for
+            # left-to-right, the character's for right-to-left
+            cells = []
+            for i in range(0, maxSmush):
+                if rtl:
+                    idx = width - maxSmush + i
+                    if idx < 0: continue
+                    left = glyph[idx]
+                    right = line[size - 1 - i] if i < size else None
+                else:
+                    idx = size - maxSmush + i
+                    if idx < 0: continue
+                    left = line[idx]
+                    right = glyph[i] if i < width else None
+
+                if right is None:
+                    # Nothing left to smush into, blanks just disappear
+                    smushed = '' if left.isspace() else left
+                else:
+                    smushed = table.get((left, right), cells)
+                    if smushed is cells:
+                        smushed = smushChars(ctx, left=left, right=right)
+                    if smushed is None:
+                        smushed = left
+
+                if smushed: cells.append(smushed)
+
+            del line[start:]
+            if rtl:
+                cells.reverse()
+                line.extend(cells)
+                if width > maxSmush:
+                    line.extend(glyph[width - maxSmush - 1::-1])
+            else:
+                line.extend(cells)
+                line.extend(glyph[maxSmush:])
+
+            # The edge moves to the new character's last non-blank if it
+            # was added beyond the smushed columns, else to the smushed ones
+            lgap, lch, rgap, rch = charEdges[row]
+            if rtl and lch != '' and lgap < width - maxSmush:
+                edge = len(line) - 1 - lgap
+            elif not rtl and rch != '' and width - 1 - rgap >= maxSmush and not rch.isspace():
+                edge = len(line) - 1 - rgap
+            else:
+                edge = self.findEdge(line, edges[row], start, start + len(cells))
+            edges[row] = edge
 
-        for c in map(ord, list(text)):
-            if (c in self.base.Font.chars) is False: continue
-            curChar = self.base.Font.chars[c]
-            self.curCharWidth = self.base.Font.width[c]
-            maxSmush = self.smushAmount(buffer=buffer, curChar=curChar)
+            if tails is not None:
+                tails.append((line[start:], edge - start if edge >= start else -1))
 
-            # Add a character to the buffer and do smushing/kerning
-            for row in range(0, self.base.Font.height):
-                addLeft = buffer[row]
-                addRight = curChar[row]
+    @staticmethod
+    def findEdge(line, edge, start, stop):
+        """
+        Last non-blank of a row whose columns from start onwards were
+        rewritten, knowing that columns from stop onwards are blank and
+        edge was the last non-blank before the rewrite
+        """
+        for k in range(stop - 1, start - 1, -1):
+            if not line[k].isspace():
+                return k
+        if edge < start:
+            return edge
+        for k in range(start - 1, -1, -1):
+            if not line[k].isspace():
+                return k
+        return -1
+
+    def pairLimit(self, ctx, prev, cur, maxSmush):
+        """
+        Largest smush amount the previous character can have been added
+        with for a (prev, cur) pair cache entry to apply.
+
+        The cur character's maxSmush columns must only overlap what's left
+        of prev, and each row's edge must lie in that part too, so prev
+        alone decides the smush amount. A row that is blank in prev can't
+        say where the edge is, but it's fine as long as even the closest
+        possible edge would leave it more room than maxSmush.
+        """
+        limit = None
+        rtl = ctx.rtl
+        rows = ctx.font.glyphs[prev].rows
+        prevEdges = ctx.font.getEdges(prev)
+        curEdges = ctx.font.getEdges(cur)
+        for row in range(0, ctx.font.height):
+            size = len(rows[row])
+            lgap, lch, rgap, rch = prevEdges[row]
+            if rtl:
+                depth = size - 1 - lgap if lch != '' else -1
+                gap = curEdges[row][2]
+            else:
+                depth = size - 1 - rgap if rch != '' and not rch.isspace() else -1
+                gap = curEdges[row][0]
+            if depth < 0:
+                depth = size + gap - maxSmush - 1
+            depth = min(depth, size - maxSmush)
+            if limit is None or depth < limit:
+                limit = depth
+        return limit
+
+    def pairStats(self):
+        """
+        Glyph pair cache statistics for the renders done by this engine
+        """
+        total = self.pairHits + self.pairMisses
+        return {
+            'hits': self.pairHits, 'misses': self.pairMisses,
+            'hitRate': float(self.pairHits) / total if total else 0.0
+        }
 
-                if self.base.direction == 'right-to-left':
-                    addLeft, addRight = addRight, addLeft
+    def addCode(self, ctx, band, c):
+        """
+        Add the character with code c to the band, returns False if the
+        font has no glyph for it
+        """
+        glyph = ctx.font.getGlyph(c)
+        if glyph is None:
+            if band.history is not None:
+                band.history.append(None)
+            return False
+        buffer = band.buffer
+        edges = band.edges
+        prev, prevSmush = band.prev, band.prevSmush
+
+        # Smush amount and rewritten row tails per (direction, previous,
+        # next) character, used whenever the previous character alone
+        # decides how the next one joins the buffer
+        key = (ctx.rtl, prev, c)
+        pair = False
+        if prev is not None:
+            pair = ctx.font.pairs.get(key, False)
+            if pair is False:
+                pair = self.recallPair(ctx.font, key)
+        if pair and prevSmush <= pair[0]:
+            ctx.pairHits += 1
+            limit, maxSmush, tails = pair
+            if band.history is not None:
+                self.checkpoint(band, maxSmush)
+            for row in range(0, ctx.font.height):
+                line = buffer[row]
+                start = len(line) - maxSmush
+                tail, tailEdge = tails[row]
+                del line[start:]
+                line.extend(tail)
+                if tailEdge >= 0:
+                    edges[row] = start + tailEdge
+                else:
+                    edges[row] = self.findEdge(line, edges[row], start, start)
+            band.codes.append(c)
+            band.prev, band.prevSmush = c, maxSmush
+            band.prevCharWidth = glyph.width
+            return True
+
+        # Pairs are only cached the second time they're seen, most
+        # pairs in a line of text never repeat
+        cache = False
+        if prev is not None:
+            ctx.pairMisses += 1
+            if pair is False:
+                self.storePair(ctx.font, key, None)
+            else:
+                cache = True
 
-                for i in range(0, maxSmush):
+        pair = self.smushCode(ctx, band, c, glyph, cache)
+        if pair is not None:
+            self.storePair(ctx.font, key, pair)
+        return True
 
-                    idx = len(addLeft) - maxSmush + i
-                    if idx >= 0 and idx < len(addLeft):
-                        left = addLeft[idx]
-                    else:
-                        left = ''
+    def recallPair(self, font, key):
+        """
+        Pair cache entry for key from the previous generation, moved into
+        the current one. False if the pair hasn't been seen, None if it
+        has been seen once.
+        """
+        pair = font.oldPairs.get(key, False)
+        if pair is not False:
+            self.storePair(font, key, pair)
+        return pair
 
-                    right = addRight[i]
+    def storePair(self, font, key, pair):
+        """
+        Store a pair cache entry, or None for a pair seen once.
 
-                    smushed = self.smushChars(left=left, right=right)
+        Once maxPairs pairs are stored the cache becomes the previous
+        generation and a new one is started. Pairs used from then on
+        move into it, the rest go with the generation after, so the
+        cache holds at most twice maxPairs pairs and keeps those in use.
+        """
+        pairs = font.pairs
+        if len(pairs) >= self.maxPairs:
+            pairs = {}
+            font.oldPairs, font.pairs = font.pairs, pairs
+        pairs[key] = pair
 
-                    l = list(addLeft)
-                    idx = len(l)-maxSmush+i
-                    if idx >= 0 and idx < len(l):
-                        l[idx] = smushed
-                        addLeft = ''.join(l)
+    def smushCode(self, ctx, band, c, glyph, cache=False):
+        """
+        Add the glyph of c to the band by working out the smush amount
+        from the band's rows. If cache is true, also returns the pair
+        cache entry (limit, smush amount, row tails) for adding c after
+        the band's last character, None if that character alone doesn't
+        decide how c is added
+        """
+        ctx.curCharWidth = glyph.width
+        ctx.prevCharWidth = band.prevCharWidth
+        charEdges = ctx.font.getEdges(c)
+        maxSmush = self.smushAmount(ctx, buffer=band.buffer, edges=band.edges, charEdges=charEdges)
+
+        tails = None
+        if cache:
+            limit = self.pairLimit(ctx, band.prev, c, maxSmush)
+            if band.prevSmush <= limit:
+                tails = []
+
+        # Add a character to the buffer and do smushing/kerning
+        if band.history is not None:
+            self.checkpoint(band, maxSmush)
+        self.addChar(ctx, band.buffer, band.edges, glyph.rows, charEdges, maxSmush, tails)
+        band.codes.append(c)
+        band.prev, band.prevSmush = c, maxSmush
+        band.prevCharWidth = glyph.width
+        if tails is None:
+            return None
+        return (limit, maxSmush, tails)
+
+    def buildPair(self, ctx, prev, c):
+        """
+        Make the pair cache entry for adding c after prev from a band of
+        just the two, None if prev alone doesn't decide how c is added
+        """
+        band = self.newBand(ctx, [prev])
+        return self.smushCode(ctx, band, c, ctx.font.getGlyph(c), True)
 
-                buffer[row] = addLeft + addRight[maxSmush:]
+    def checkpoint(self, band, maxSmush):
+        """
+        Save what adding a character smushed maxSmush columns into the
+        band is about to change: the end of each row and its edge, and
+        the previous character
+        """
+        rows = []
+        for row in range(0, len(band.buffer)):
+            line = band.buffer[row]
+            start = len(line) - maxSmush
+            if start < 0: start = 0
+            rows.append((start, line[start:], band.edges[row]))
+        band.history.append((rows, band.prev, band.prevSmush, band.prevCharWidth))
+
+    def removeCode(self, ctx, band):
+        """
+        Take the last character added out of a band that keeps a history,
+        restoring the rows from its checkpoint rather than rendering the
+        band again
+        """
+        entry = band.history.pop()
+        if entry is None:
+            # The font had no glyph for it, nothing was added
+            return
+        rows, band.prev, band.prevSmush, band.prevCharWidth = entry
+        for row in range(0, len(rows)):
+            start, cells, edge = rows[row]
+            line = band.buffer[row]
+            del line[start:]
+            line.extend(cells)
+            band.edges[row] = edge
+        band.codes.pop()
+
+    def newBand(self, ctx, codes=()):
+        """
+        Start a band of output, rendering codes into it
+        """
+        band = FigletBand(ctx.font.height)
+        for c in codes:
+            self.addCode(ctx, band, c)
+        return band
 
-            self.prevCharWidth = self.curCharWidth
+    def finishBand(self, ctx, band):
+        """
+        Join, justify and return the rows of a band
+        """
+        return FigletString('\n'.join(self.bandRows(ctx, band)))
 
+    def bandRows(self, ctx, band):
+        """
+        Join, justify and return the list of finished rows of a band,
+        the band itself is left as it is
+        """
+        if ctx.rtl:
+            return self.layoutRows(ctx, [''.join(reversed(line)) for line in band.buffer])
+        return self.layoutRows(ctx, [''.join(line) for line in band.buffer])
 
+    def layoutRows(self, ctx, buffer):
+        """
+        Justify the joined rows of a band, then replace hardblanks and
+        reverse and flip them if the Figlet asks for it, a row at a time
+        """
         # Justify text. This does not use str.rjust/str.center
         # specifically because the output would not match FIGlet
-        if self.base.justify == 'right':
-            for row in range(0, self.base.Font.height):
-                buffer[row] = (' ' * (self.base.width - len(buffer[row]) - 1)) + buffer[row]
+        if ctx.justify == 'right':
+            for row in range(0, ctx.font.height):
+                buffer[row] = (' ' * (ctx.width - len(buffer[row]) - 1)) + buffer[row]
+
+        elif ctx.justify == 'center':
+            for row in range(0, ctx.font.height):
+                buffer[row] = (' ' * int((ctx.width - len(buffer[row])) / 2)) + buffer[row]
+
+        # One translation replaces the hardblanks and swaps the characters
+        # of the transform, the rows are then mirrored or turned over
+        table = FigletString.rowTransform(ctx.font.hardBlank, ctx.reverse, ctx.flip)
+        if ctx.reverse:
+            buffer = [row.translate(table)[::-1] for row in buffer]
+        else:
+            buffer = [row.translate(table) for row in buffer]
+        if ctx.flip:
+            buffer.reverse()
+
+        return buffer
+
+    def render(self, text, layout=None):
+        """
+        Render an ASCII text string in figlet, each line of the text
+        as a band of its own. Goes through the Figlet's render cache if
+        it has one.
+
+        With a FigletLayout the rows are laid out as they are joined and
+        the text is returned as a plain string. The cache keeps the rows
+        before they are joined, so they serve any layout.
+        """
+        ctx = self.newContext()
+        cache = self.base.renderCache
+        rows = None
+        if cache is not None:
+            key = (
+                ctx.font, text, ctx.width, ctx.justify,
+                ctx.direction, ctx.reverse, ctx.flip
+            )
+            rows = cache.get(key)
+
+        if rows is None:
+            rows = []
+            for band in self.renderBandRows(ctx, text.split('\n')):
+                rows.extend(band)
+            self.endContext(ctx)
+            if cache is not None:
+                rows = tuple(rows)
+                cache.put(key, rows)
+
+        if layout is None:
+            return FigletString('\n'.join(rows))
+        return layout.join(rows)
+
+    def renderMany(self, texts):
+        """
+        Render a list of strings
+        """
+        return [self.render(text) for text in texts]
+
+    def renderLines(self, ctx, lines):
+        """
+        Render a list of lines, returns a band per line
+        """
+        return [FigletString('\n'.join(rows)) for rows in self.renderBandRows(ctx, lines)]
+
+    def renderBandRows(self, ctx, lines):
+        """
+        Render a list of lines, returns the finished rows of a band per line
+        """
+        return [self.bandRows(ctx, self.newBand(ctx, map(ord, line))) for line in lines]
+
+    def renderBands(self, text):
+        """
+        Render each line of text, yielding one band per line
+        """
+        ctx = self.newContext()
+        for line in text.split('\n'):
+            yield self.finishBand(ctx, self.newBand(ctx, map(ord, line)))
+        self.endContext(ctx)
+
+    def renderStream(self, text):
+        """
+        Render text, a string or an iterable of strings read as needed,
+        wrapping it at the width like FIGlet: lines break at newlines and
+        after the last word that fits, or between characters if a word
+        doesn't fit on a line of its own. Yields the bands of output, only
+        the band being rendered is kept in memory.
+        """
+        ctx = self.newContext()
+        limit = ctx.width - 1
+        band = self.newBand(ctx)
+
+        for chunk in text:
+            for c in map(ord, chunk):
+                if c == 10:
+                    yield self.finishBand(ctx, band)
+                    band = self.newBand(ctx)
+                    continue
+
+                # Lines don't start with blanks
+                if c == 32 and not band.codes: continue
+                if not self.addCode(ctx, band, c): continue
+
+                while len(band.codes) > 1 and band.width() > limit:
+                    codes = band.codes
+                    split = len(codes) - 1
+                    if c != 32:
+                        # Break at the last blank, unless it's all one word
+                        space = split - 1
+                        while space >= 0 and codes[space] != 32:
+                            space -= 1
+                        if space > 0:
+                            split = space
+                    line, rest = codes[:split], codes[split:]
+                    while line and line[-1] == 32:
+                        line.pop()
+                    while rest and rest[0] == 32:
+                        rest.pop(0)
+
+                    yield self.finishBand(ctx, self.newBand(ctx, line))
+                    band = self.newBand(ctx, rest)
+
+        if band.codes:
+            yield self.finishBand(ctx, band)
+        self.endContext(ctx)
+
+    def measure(self, text):
+        """
+        Width and height the output of render(text) would have, worked
+        out from the glyphs without building any rows
+        """
+        ctx = self.newContext()
+        lines = text.split('\n')
+        width = max([self.measureBand(ctx, map(ord, line)) for line in lines])
 
-        elif self.base.justify == 'center':
-            for row in range(0, self.base.Font.height):
-                buffer[row] = (' ' * int((self.base.width - len(buffer[row])) / 2)) + buffer[row]
+        # Justification pads the rows, same as layoutRows
+        if ctx.justify == 'right':
+            width = max(width, ctx.width - 1)
+        elif ctx.justify == 'center':
+            width += max(int((ctx.width - width) / 2), 0)
 
-        # return rendered ASCII with hardblanks replaced
-        buffer = '\n'.join(buffer)
-        buffer = buffer.replace(self.base.Font.hardBlank, ' ')
+        self.endContext(ctx)
+        return width, len(lines) * ctx.font.height
 
-        return FigletString(buffer)
+    def measureBand(self, ctx, codes):
+        """
+        Length of the longest row of the band codes would render to.
+
+        Instead of its characters, each row is tracked as its length, the
+        index and character of its last non-blank (kept like a band's
+        edges, stored reversed for right-to-left) and its first character.
+        Pairs the pair cache has an entry for move these along from the
+        entry's row tails, other characters go through measureChar().
+        """
+        font = ctx.font
+        height = font.height
+        rtl = ctx.rtl
+        sizes = [0] * height
+        edges = [-1] * height
+        edgeChars = [''] * height
+        firsts = [''] * height
+        prev = prevSmush = None
+        prevWidth = 0
+
+        for c in codes:
+            glyph = font.getGlyph(c)
+            if glyph is None: continue
+
+            # Pairs seen for the first time are remembered like addCode()
+            # does, so rendering the text afterwards caches them
+            key = (rtl, prev, c)
+            pair = False
+            if prev is not None:
+                pair = font.pairs.get(key, False)
+                if pair is False:
+                    pair = self.recallPair(font, key)
+            if pair and prevSmush <= pair[0]:
+                limit, maxSmush, tails = pair
+                for row in range(0, height):
+                    start = sizes[row] - maxSmush
+                    tail, tailEdge = tails[row]
+                    sizes[row] = start + len(tail)
+                    if tailEdge >= 0:
+                        edges[row], edgeChars[row] = start + tailEdge, tail[tailEdge]
+                    if start == 0:
+                        firsts[row] = tail[0] if tail else ''
+            else:
+                if pair is False and prev is not None:
+                    self.storePair(font, key, None)
+                ctx.curCharWidth = glyph.width
+                ctx.prevCharWidth = prevWidth
+                maxSmush = self.measureChar(
+                    ctx, sizes, edges, edgeChars, firsts, glyph.rows, font.getEdges(c))
+            prev, prevSmush, prevWidth = c, maxSmush, glyph.width
+
+        return max(sizes) if sizes else 0
+
+    def measureChar(self, ctx, sizes, edges, edgeChars, firsts, curChar, charEdges):
+        """
+        Add a character to the rows tracked by measureBand() the way
+        smushAmount() and addChar() add it to a band, returns the smush
+        amount.
+
+        A row's cells after its last non-blank are blank, and smushing
+        only reaches the cells before it with the glyph's own leading
+        blanks, which keep them. So the overlapped cells are the glyph's
+        bar the one at the last non-blank, and the glyph's edges say
+        where the new last non-blank is.
+        """
+        rtl = ctx.rtl
+        height = len(sizes)
+        smushing = ctx.font.smushMode & (self.SM_SMUSH | self.SM_KERN)
+
+        # Same as smushAmount(), with the buffer's side of each row taken
+        # from the tracked edges
+        maxSmush = ctx.curCharWidth if smushing else 0
+        for row in range(0, height if smushing else 0):
+            lgap, ch2, rgap, ch1 = charEdges[row]
+            size, edge = sizes[row], edges[row]
+            if rtl:
+                if edge < 0:
+                    lgap, ch2 = size, ''
+                else:
+                    lgap, ch2 = size - 1 - edge, edgeChars[row]
+            else:
+                if edge >= 0:
+                    rgap, ch1 = size - 1 - edge, edgeChars[row]
+                elif size:
+                    rgap, ch1 = size - 1, firsts[row]
+                else:
+                    rgap, ch1 = -1, ''
+
+            amt = lgap + rgap
+            if ch1 == '' or ch1 == ' ':
+                amt += 1
+            elif ch2 != '' and self.smushChars(ctx, left=ch1, right=ch2) is not None:
+                amt += 1
+            if amt < maxSmush:
+                maxSmush = amt
+
+        for row in range(0, height):
+            glyph = curChar[row]
+            size, edge = sizes[row], edges[row]
+            width = len(glyph)
+            start = size - maxSmush
+            if start < 0: start = 0
+            lgap, lch, rgap, rch = charEdges[row]
+
+            if rtl:
+                # Overlap column i pairs glyph column width - maxSmush + i
+                # with row cell size - 1 - i, the glyph's columns left of
+                # the row are kept only where they aren't blank
+                first = maxSmush - width if maxSmush > width else 0
+                over = size - 1 - edge if edge >= 0 else size
+                kept = maxSmush - first
+                for i in range(size if size > first else first, maxSmush):
+                    if glyph[width - maxSmush + i].isspace():
+                        kept -= 1
+                size = start + kept
+                if width > maxSmush: size += width - maxSmush
+
+                # Cells are stored from the last overlap column down to
+                # the first, the glyph's columns before them after them
+                near = lgap - (width - maxSmush)
+                if lch != '' and near < 0:
+                    edge, edgeChar = size - 1 - lgap, lch
+                elif lch != '' and (near < over or edge < 0):
+                    before = (near if near < size else size) - first
+                    edge, edgeChar = start + kept - 1 - (before if before > 0 else 0), lch
+                elif edge >= 0 and over < maxSmush:
+                    left = glyph[width - maxSmush + over]
+                    edgeChar = self.smushChars(ctx, left=left, right=edgeChars[row])
+                    if edgeChar is None: edgeChar = left
+                    edge = start + kept - 1 - (over - first)
+                else:
+                    edgeChar = edgeChars[row]
+            else:
+                # Overlap column i pairs row cell size - maxSmush + i with
+                # glyph column i, cells past the glyph are kept up to the
+                # row's last non-blank
+                first = start - (size - maxSmush)
+                over = edge - (size - maxSmush)
+                kept = over - first + 1 if over >= first else 0
+                after = first if first > over else over + 1
+                stop = maxSmush if maxSmush < width else width
+                if stop > after: kept += stop - after
+                size = start + kept
+                if width > maxSmush: size += width - maxSmush
+
+                last = width - 1 - rgap
+                if rch == '' or rch.isspace():
+                    last = -1
+                if last >= maxSmush:
+                    edge, edgeChar = size - 1 - rgap, rch
+                elif last > over and last >= first:
+                    edge, edgeChar = start + kept - (stop - after) + last - after, rch
+                elif over >= first:
+                    left = edgeChars[row]
+                    edgeChar = left
+                    if over < width:
+                        edgeChar = self.smushChars(ctx, left=left, right=glyph[over])
+                        if edgeChar is None: edgeChar = left
+                else:
+                    edgeChar = edgeChars[row]
+                if start == 0:
+                    firsts[row] = glyph[first] if first < width else ''
+
+            sizes[row], edges[row], edgeChars[row] = size, edge, edgeChar
+
+        return maxSmush
+
+
+class PairPieces(object):
+    """
+    Rendered pieces of a font's character pairs in one direction, kept as
+    arrays for NumpyRenderingEngine.
+
+    glyphs tells which Latin-1 codes the font has a glyph for, ids maps
+    a (previous, next) pair of Latin-1 codes to a piece, with row 256 for
+    the first character of a line, -1 for pairs not seen yet and -2 for
+    pairs whose piece depends on more than the previous character. Each
+    piece has the smush amount it's added with, the largest amount its
+    previous character may have been added with (see
+    FigletRenderingEngine.pairLimit) and a string per row.
+    """
+
+    def __init__(self, np, font):
+        self.np = np
+        self.height = font.height
+        self.ids = np.full((257, 256), -1, dtype=np.int64)
+        self.glyphs = np.array([font.getChar(c) is not None for c in range(0, 256)])
+        self.entries = []
+        self.built = -1
+        self.lock = threading.Lock()
+
+    def add(self, amount, limit, rows):
+        self.entries.append((amount, limit, rows))
+        return len(self.entries) - 1
+
+    def build(self):
+        """
+        Turn the pieces into arrays, once per batch of new pieces
+        """
+        if self.built == len(self.entries):
+            return
+        np = self.np
+        self.amounts = np.array([e[0] for e in self.entries], dtype=np.int64)
+        self.limits = np.array([e[1] for e in self.entries], dtype=np.int64)
+        self.lengths = np.array(
+            [[len(row) for row in e[2]] for e in self.entries], dtype=np.int64
+        ).reshape(len(self.entries), self.height)
+        self.offsets = np.cumsum(self.lengths, axis=0) - self.lengths
+        self.pools = [
+            np.frombuffer(''.join([e[2][row] for e in self.entries]).encode('utf-32-le'), dtype=np.uint32)
+            for row in range(0, self.height)
+        ]
+        self.built = len(self.entries)
+
+
+class NumpyRenderingEngine(FigletRenderingEngine):
+    """
+    Rendering engine for large batches that lays out all lines of a batch
+    at once with NumPy instead of adding one character at a time.
+
+    Whenever the previous character alone decides how the next one joins
+    the line (see pairLimit), each pair of characters adds a fixed piece
+    to every row: the smushed columns and the rest of the glyph. Pieces
+    are rendered once per font and pair, then the lines are assembled by
+    working out where each piece starts and how much of it the pieces
+    after it overwrite. Lines where that doesn't hold, or with characters
+    beyond Latin-1, are rendered by the pure Python engine, so the output
+    is always the same.
+    """
+
+    numpy = None
+
+    @classmethod
+    def available(cls):
+        """
+        Whether NumPy can be imported, it isn't loaded until needed
+        """
+        if cls.numpy is None:
+            try:
+                import numpy
+                cls.numpy = numpy
+            except ImportError:
+                cls.numpy = False
+        return cls.numpy is not False
+
+    def renderBands(self, text):
+        ctx = self.newContext()
+        bands = self.renderLines(ctx, text.split('\n'))
+        self.endContext(ctx)
+        return iter(bands)
+
+    def renderMany(self, texts):
+        """
+        Render a list of strings as one batch
+        """
+        lines = []
+        counts = []
+        for text in texts:
+            split = text.split('\n')
+            lines.extend(split)
+            counts.append(len(split))
+
+        ctx = self.newContext()
+        bands = self.renderBandRows(ctx, lines)
+        self.endContext(ctx)
+        results = []
+        pos = 0
+        for count in counts:
+            rows = []
+            for band in bands[pos:pos + count]:
+                rows.extend(band)
+            results.append(FigletString('\n'.join(rows)))
+            pos += count
+        return results
+
+    def getPieces(self, ctx):
+        table = ctx.font.pairRows.get(ctx.rtl)
+        if table is None:
+            table = ctx.font.pairRows.setdefault(ctx.rtl, PairPieces(self.numpy, ctx.font))
+        return table
+
+    def addPiece(self, ctx, table, prev, c):
+        """
+        Render the piece for a (prev, c) pair, prev is 256 for the first
+        character of a line
+        """
+        if prev == 256:
+            band = self.newBand(ctx, [c])
+            return table.add(0, 0, [''.join(line) for line in band.buffer])
+
+        pair = self.buildPair(ctx, prev, c)
+        if pair is None:
+            return -2
+        limit, maxSmush, tails = pair
+        return table.add(maxSmush, limit, [''.join(tail) for tail, tailEdge in tails])
+
+    def renderBandRows(self, ctx, lines):
+        """
+        Render a list of lines, returns the finished rows of a band per line
+        """
+        if not self.available():
+            return FigletRenderingEngine.renderBandRows(self, ctx, lines)
+
+        np = self.numpy
+        font = ctx.font
+        height = font.height
+        rtl = ctx.rtl
+        table = self.getPieces(ctx)
+
+        # All lines as one array of codes, newlines marking where they end
+        codes = np.frombuffer('\n'.join(lines).encode('utf-32-le'), dtype=np.uint32).astype(np.int64)
+        breaks = codes == 10
+        lineIds = np.cumsum(breaks)
+        count = len(lines)
+
+        # Lines with characters beyond Latin-1 are left to the Python engine
+        fallback = np.zeros(count, dtype=bool)
+        wide = codes > 255
+        fallback[lineIds[wide]] = True
+
+        # Drop the newlines and the characters the font has no glyph for
+        keep = ~breaks & ~wide
+        keep[keep] = table.glyphs[codes[keep]]
+        codes = codes[keep]
+        lineIds = lineIds[keep]
+
+        # Piece of each character, given the one before it on its line
+        first = np.ones(len(codes), dtype=bool)
+        first[1:] = lineIds[1:] != lineIds[:-1]
+        prev = np.empty(len(codes), dtype=np.int64)
+        prev[1:] = codes[:-1]
+        prev[first] = 256
+
+        # Pieces are added and built under the table's lock, the arrays of
+        # a build are never changed afterwards
+        with table.lock:
+            ids = table.ids[prev, codes]
+            missing = ids == -1
+            if missing.any():
+                pairs = set(zip(prev[missing].tolist(), codes[missing].tolist()))
+                for p, c in pairs:
+                    table.ids[p, c] = self.addPiece(ctx, table, p, c)
+                ids = table.ids[prev, codes]
+            table.build()
+            pieceAmounts, pieceLimits, pieceLengths = table.amounts, table.limits, table.lengths
+            pieceOffsets, piecePools = table.offsets, table.pools
+
+        fallback[lineIds[ids == -2]] = True
+        if fallback.any():
+            usable = ~fallback[lineIds]
+            ids, lineIds, first = ids[usable], lineIds[usable], first[usable]
+
+        amounts = pieceAmounts[ids]
+
+        # A piece only applies if its previous character was added with
+        # no more than the pair's limit
+        if len(ids) > 1:
+            second = np.zeros(len(ids), dtype=bool)
+            second[1:] = ~first[1:] & ~first[:-1]
+            broken = second[1:] & (amounts[:-1] > pieceLimits[ids[1:]])
+            fallback[lineIds[1:][broken]] = True
+
+        # Where each piece starts and ends in its row, the first piece
+        # after it to start inside it cuts it short
+        lengths = pieceLengths[ids]
+        ends = np.cumsum(lengths - amounts[:, None], axis=0)
+        lineStart = np.zeros((count, height), dtype=np.int64)
+        firsts = np.nonzero(first)[0]
+        lineStart[lineIds[firsts]] = ends[firsts] - lengths[firsts]
+        ends -= lineStart[lineIds]
+        starts = ends - lengths
+        fallback[lineIds[(starts < 0).any(axis=1)]] = True
+
+        if len(ids):
+            span = int(ends.max() - starts.min()) + 1
+            keys = starts - starts.min() + lineIds[:, None] * span
+            cut = np.ascontiguousarray(np.minimum.accumulate(keys[::-1], axis=0)[::-1])
+            cut[:-1] = cut[1:].copy()
+            cut -= lineIds[:, None] * span - starts.min()
+            last = np.ones(len(ids), dtype=bool)
+            last[:-1] = first[1:]
+            cut[last] = ends[last]
+            kept = np.clip(cut - starts, 0, lengths)
+        else:
+            kept = lengths
+
+        # Gather the kept characters of each row, then split them by line
+        rows = []
+        for row in range(0, height):
+            size = lengths[:, row]
+            within = np.arange(int(size.sum())) - np.repeat(np.cumsum(size) - size, size)
+            index = np.repeat(pieceOffsets[ids, row], size) + within
+            index = index[within < np.repeat(kept[:, row], size)]
+            text = piecePools[row][index].tobytes().decode('utf-32-le')
+            sizes = np.bincount(lineIds, weights=kept[:, row], minlength=count).astype(np.int64)
+            bounds = np.concatenate(([0], np.cumsum(sizes))).tolist()
+            rows.append([text[bounds[i]:bounds[i + 1]] for i in range(0, count)])
+
+        bands = []
+        for i in range(0, count):
+            if fallback[i]:
+                bands.append(self.bandRows(ctx, self.newBand(ctx, map(ord, lines[i]))))
+            elif rtl:
+                bands.append(self.layoutRows(ctx, [rows[row][i][::-1] for row in range(0, height)]))
+            else:
+                bands.append(self.layoutRows(ctx, [rows[row][i] for row in range(0, height)]))
+        return bands
 
 
 class Figlet(object):
@@ -452,13 +2376,28 @@ class Figlet(object):
     Main figlet class.
     """
 
-    def __init__(self, font=DEFAULT_FONT, direction='auto', justify='auto', width=80, module=DEFAULT_MODULE):
+    def __init__(self, font=DEFAULT_FONT, direction='auto', justify='auto', width=80, module=DEFAULT_MODULE, backend='python',
+                 reverse=False, flip=False, renderCache=None):
         self.font = font
         self._direction = direction
         self._justify = justify
         self.width = width
+        self.reverse = reverse
+        self.flip = flip
+        self.renderCache = renderCache
         self.setFont(module=module)
-        self.engine = FigletRenderingEngine(base=self)
+        self.setBackend(backend)
+
+    def setBackend(self, backend='python'):
+        """
+        Pick the rendering engine, 'python' or 'numpy'. The NumPy engine
+        is for large batches and falls back to the pure Python one if
+        NumPy isn't installed.
+        """
+        if backend == 'numpy' and NumpyRenderingEngine.available():
+            self.engine = NumpyRenderingEngine(base=self)
+        else:
+            self.engine = FigletRenderingEngine(base=self)
 
     def setFont(self, **kwargs):
         module = kwargs.get('module', None)
@@ -466,7 +2405,8 @@ class Figlet(object):
         if 'font' in kwargs:
             self.font = kwargs['font']
 
-        self.Font = FigletFont(font=self.font, module=module)
+        self.location = module
+        self.Font = FONT_CACHE.load(FigletFont, self.font, module)
 
     def getDirection(self):
         if self._direction == 'auto':
@@ -495,15 +2435,82 @@ class Figlet(object):
 
     justify = property(getJustify)
 
-    def renderText(self, text):
+    def renderText(self, text, layout=None):
         # wrapper method to engine
-        return self.engine.render(text)
+        return self.engine.render(text, layout)
+
+    def measure(self, text):
+        """
+        Width and height of the output of renderText(text), without
+        rendering it
+        """
+        return self.engine.measure(text)
+
+    def renderBands(self, text):
+        """
+        Render each line of text, yielding one band per line
+        """
+        return self.engine.renderBands(text)
+
+    def liveRender(self, text=''):
+        """
+        Start rendering text that is being typed, see LiveRender
+        """
+        return LiveRender(self.engine, text)
+
+    def renderStream(self, text):
+        """
+        Render text wrapped at the width, yielding one band at a time,
+        see FigletRenderingEngine.renderStream
+        """
+        return self.engine.renderStream(text)
+
+    def renderMany(self, texts, executor=None, chunkSize=64):
+        """
+        Render a list of strings with this font and options, returning
+        the results in the same order.
+
+        Batches larger than chunkSize can be spread over a
+        concurrent.futures style executor. A thread pool shares the loaded
+        font; with a process pool each worker loads the font once.
+        """
+        texts = list(texts)
+        if executor is None or len(texts) <= chunkSize:
+            return self.engine.renderMany(texts)
+
+        options = (
+            self.__class__, self.font, self._direction,
+            self._justify, self.width, self.location, self.engine.__class__,
+            self.reverse, self.flip
+        )
+        chunks = [texts[i:i + chunkSize] for i in range(0, len(texts), chunkSize)]
+        results = []
+        for chunk in executor.map(renderBatch, [options] * len(chunks), chunks):
+            results.extend(chunk)
+        return results
 
     def getFonts(self, module=DEFAULT_MODULE):
         return self.Font.getFonts(module)
 
 
+def renderBatch(options, texts):
+    """
+    Render texts with a new Figlet built from (class, font, direction,
+    justify, width, module or directory, engine class, reverse, flip),
+    used by Figlet.renderMany. The font comes from the font cache, the
+    engine is private to the batch.
+    """
+    cls, font, direction, justify, width, location, engine, reverse, flip = options
+    fig = cls(font, direction, justify, width, location)
+    fig.reverse, fig.flip = reverse, flip
+    if fig.engine.__class__ is not engine:
+        fig.engine = engine(base=fig)
+    return fig.engine.renderMany(texts)
+
+
 def main():
+    from optparse import OptionParser
+
     parser = OptionParser(version=__version__, usage='%prog [options] [text..]')
     parser.add_option('-f', '--font', default=DEFAULT_FONT,
             help='font to render with (default: %default)', metavar='FONT')
@@ -538,13 +2545,10 @@ def main():
     f = Figlet(
         font=opts.font, direction=opts.direction,
         justify=opts.justify, width=opts.width,
-        module=opts.module
+        module=opts.module, reverse=opts.reverse, flip=opts.flip
     )
 
-    r = f.renderText(text)
-    if opts.reverse is True: r = r.reverse()
-    if opts.flip is True: r = r.flip()
-    print(r)
+    print(f.renderText(text))
 
     return 0
 
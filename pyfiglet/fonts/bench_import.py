@@ -0,0 +1,55 @@
+import os
+import py_compile
+import subprocess
+import sys
+
+pth = os.path.dirname(os.path.abspath(sys.argv[0]))
+root = os.path.dirname(os.path.dirname(pth))
+
+# Modules importing pyfiglet must not pull in, they're slow to import
+# or only needed by some commands
+LAZY = ('pkg_resources', 'zipfile', 'optparse')
+
+PROBE = """
+import sys, time
+sys.path.insert(0, %r)
+start = time.time()
+import pyfiglet
+elapsed = time.time() - start
+print('%%.2f %%s' %% (elapsed * 1000, ','.join(m for m in %r if m in sys.modules)))
+""" % (root, LAZY)
+
+
+def probe():
+    """
+    Import pyfiglet in a fresh interpreter, returns the milliseconds it
+    took and the lazily imported modules that were imported anyway
+    """
+    output = subprocess.Popen(
+        [sys.executable, '-c', PROBE], stdout=subprocess.PIPE
+    ).communicate()[0].decode('ascii').split()
+    return float(output[0]), output[1:] and output[1].split(',')
+
+
+if __name__ == '__main__':
+    # Usage: bench_import.py [runs] [limit in ms]
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    limit = float(sys.argv[2]) if len(sys.argv) > 2 else 50.0
+
+    # Time the import from bytecode, as installed packages are imported
+    py_compile.compile(os.path.join(root, 'pyfiglet', '__init__.py'))
+    times = []
+    imported = []
+    for i in range(0, runs):
+        elapsed, modules = probe()
+        times.append(elapsed)
+        imported.extend(m for m in modules if m not in imported)
+
+    best = min(times)
+    print("import pyfiglet: best %.1fms of %d runs (limit %.0fms)" % (best, runs, limit))
+    if imported:
+        print("    Imported eagerly: %s" % ', '.join(imported))
+    if best > limit or imported:
+        print("    FAILED")
+        sys.exit(1)
+    print("    Success!")
@@ -0,0 +1,123 @@
+import gc
+import os
+import re
+import sys
+
+pth = os.path.dirname(os.path.abspath(sys.argv[0]))
+sys.path.insert(0, os.path.dirname(os.path.dirname(pth)))
+
+import pyfiglet
+
+
+class SourceFont(pyfiglet.FigletFont):
+    """
+    Always parse from the FLF source, never from the bundle
+    """
+
+    @classmethod
+    def getBundle(cls, module=pyfiglet.DEFAULT_MODULE):
+        return None
+
+
+class OldFont(pyfiglet.FigletFont):
+    """
+    Fonts as they were kept before glyphs were made compact: parallel
+    chars and width dicts, with a list of row strings per character
+    """
+
+    reEndMarker = re.compile(r'(.)\s*$')
+
+    def __init__(self, font=pyfiglet.DEFAULT_FONT, module=pyfiglet.DEFAULT_MODULE):
+        self.font = font
+        self.comment = ''
+        self.chars = {}
+        self.width = {}
+        self.data = self.preloadFont(font, module)
+        self.loadFont()
+
+    def loadFont(self):
+        try:
+            data = self.data.splitlines()
+
+            header = data.pop(0)
+            (hardBlank, height, baseLine, maxLength, commentLines,
+                printDirection, fullLayout, codeTagCount) = self.parseHeader(
+                    header, self.font)
+
+            self.height = height
+            self.hardBlank = hardBlank
+            self.printDirection = printDirection
+            self.smushMode = fullLayout
+
+            for i in range(0, commentLines):
+                self.comment += data.pop(0)
+
+            for i in range(32, 127):
+                end = None
+                width = 0
+                chars = []
+                for j in range(0, height):
+                    line = data.pop(0)
+                    if end is None:
+                        end = self.reEndMarker.search(line).group(1)
+                        end = re.compile(re.escape(end) + r'{1,2}$')
+
+                    line = end.sub('', line)
+
+                    if len(line) > width: width = len(line)
+                    chars.append(line)
+
+                if ''.join(chars) != '':
+                    self.chars[i] = chars
+                    self.width[i] = width
+
+        except Exception as e:
+            raise pyfiglet.FontError('problem parsing %s font: %s' % (self.font, e))
+
+
+def footprint(cls, fonts):
+    """
+    Bytes held by every font loaded with cls, and the number of fonts
+    that could be loaded
+    """
+    gc.collect()
+    start = tracemalloc.get_traced_memory()[0]
+    loaded = []
+    for font in fonts:
+        try:
+            loaded.append(cls(font))
+        except pyfiglet.FigletError:
+            pass
+    gc.collect()
+    size = tracemalloc.get_traced_memory()[0] - start
+    count = len(loaded)
+    del loaded
+    return size, count
+
+
+if __name__ == '__main__':
+    # Usage: bench_memory.py
+    try:
+        import tracemalloc
+    except ImportError:
+        print("tracemalloc needs Python 3.4 or later")
+        sys.exit(1)
+
+    fonts = []
+    for f in sorted(os.listdir(pth)):
+        if f.lower().endswith((".flf", ".tlf")):
+            fonts.append(f[:-4])
+
+    tracemalloc.start()
+    results = []
+    for name, cls in (('before', OldFont), ('after', SourceFont),
+                      ('after, bundled', pyfiglet.FigletFont)):
+        size, count = footprint(cls, fonts)
+        results.append(size)
+        print("%-15s %6.1f MB for %d fonts" % (name, size / 1048576.0, count))
+    tracemalloc.stop()
+
+    if results[1] >= results[0]:
+        print("    FAILED")
+        sys.exit(1)
+    print("    Success!")
@@ -0,0 +1,150 @@
+import os
+import re
+import sys
+import time
+
+pth = os.path.dirname(os.path.abspath(sys.argv[0]))
+sys.path.insert(0, os.path.dirname(os.path.dirname(pth)))
+
+import pyfiglet
+
+
+class SourceFont(pyfiglet.FigletFont):
+    """
+    Parse from FLF source read ahead of time, never from the bundle, so
+    only decoding and parsing are timed
+    """
+
+    sources = {}
+
+    @classmethod
+    def readFont(cls, font, directory):
+        return font, cls.sources[font]
+
+    @classmethod
+    def getBundle(cls, directory):
+        return None
+
+
+class OldSourceFont(SourceFont):
+    """
+    The parser fonts were loaded with before parsing was made linear: it
+    pops lines off the front of the file and strips the end markers of
+    every row with a regex compiled per character
+    """
+
+    reEndMarker = re.compile(r'(.)\s*$')
+
+    def loadFont(self):
+        try:
+            data = self.data.splitlines()
+
+            header = data.pop(0)
+            (hardBlank, height, baseLine, maxLength, commentLines,
+                printDirection, fullLayout, codeTagCount) = self.parseHeader(
+                    header, self.font)
+
+            self.height = height
+            self.hardBlank = hardBlank
+            self.printDirection = printDirection
+            self.smushMode = fullLayout
+
+            for i in range(0, commentLines):
+                self.comment += data.pop(0)
+
+            for i in range(32, 127):
+                end = None
+                width = 0
+                chars = []
+                for j in range(0, height):
+                    line = data.pop(0)
+                    if end is None:
+                        end = self.reEndMarker.search(line).group(1)
+                        end = re.compile(re.escape(end) + r'{1,2}$')
+
+                    line = end.sub('', line)
+
+                    if len(line) > width: width = len(line)
+                    chars.append(line)
+
+                if ''.join(chars) != '':
+                    self.glyphs[i] = pyfiglet.Glyph(chars, width)
+
+        except Exception as e:
+            raise pyfiglet.FontError('problem parsing %s font: %s' % (self.font, e))
+
+
+def parseAll(cls, fonts):
+    """
+    Parse every font with cls, returns the seconds it took and the parsed
+    fonts by name, None for those that couldn't be parsed
+    """
+    parsed = {}
+    start = time.time()
+    for f in fonts:
+        try:
+            parsed[f] = cls(f, pth)
+        except pyfiglet.FigletError:
+            parsed[f] = None
+    return time.time() - start, parsed
+
+
+def compare(old, new):
+    """
+    Codes of the ASCII glyphs whose rows or width differ between two
+    parses of a font
+    """
+    differ = []
+    for i in range(32, 127):
+        a, b = old.glyphs.get(i), new.glyphs.get(i)
+        if (a is None) != (b is None):
+            differ.append(i)
+        elif a is not None and (a.rows != b.rows or a.width != b.width):
+            differ.append(i)
+    return differ
+
+
+if __name__ == '__main__':
+    # Usage: bench_parse.py [runs]
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 3
+
+    fonts = []
+    for f in sorted(os.listdir(pth)):
+        file_pth = os.path.join(pth, f)
+        if os.path.isfile(file_pth) and f.lower().endswith((".flf", ".tlf")):
+            with open(file_pth, 'rb') as source:
+                SourceFont.sources[f] = source.read()
+            fonts.append(f)
+
+    oldTimes = []
+    newTimes = []
+    for i in range(0, runs):
+        elapsed, oldFonts = parseAll(OldSourceFont, fonts)
+        oldTimes.append(elapsed)
+        elapsed, newFonts = parseAll(SourceFont, fonts)
+        newTimes.append(elapsed)
+
+    failed = False
+    skipped = 0
+    for f in fonts:
+        old, new = oldFonts[f], newFonts[f]
+        if old is None:
+            # Fonts the old parser choked on have nothing to compare with
+            skipped += 1
+        elif new is None:
+            failed = True
+            print("%s: only the old parser loads it" % f)
+        else:
+            differ = compare(old, new)
+            if differ:
+                failed = True
+                print("%s: %d glyphs differ, first %d" % (f, len(differ), differ[0]))
+
+    print("Parsed %d fonts: old %.3fs, new %.3fs, best of %d runs" % (
+        len(fonts), min(oldTimes), min(newTimes), runs))
+    if skipped:
+        print("    %d fonts the old parser can't load were skipped" % skipped)
+    if failed:
+        print("    FAILED")
+        sys.exit(1)
+    print("    Success!")
@@ -0,0 +1,69 @@
+import os
+import sys
+import time
+
+pth = os.path.dirname(os.path.abspath(sys.argv[0]))
+sys.path.insert(0, os.path.dirname(os.path.dirname(pth)))
+
+import pyfiglet
+
+FONTS = ('standard', 'big', 'banner3')
+DIRECTIONS = ('left-to-right', 'right-to-left')
+SIZES = (1000, 10000, 100000)
+SAMPLE = 'The quick brown fox jumps over the lazy dog 0123456789! '
+
+
+def sample(size):
+    """
+    Text of size characters
+    """
+    return (SAMPLE * (size // len(SAMPLE) + 1))[:size]
+
+
+def timeRender(fig, text, runs):
+    """
+    Best time, in seconds, of rendering text runs times
+    """
+    best = None
+    for i in range(0, runs):
+        start = time.time()
+        fig.renderText(text)
+        elapsed = time.time() - start
+        if best is None or elapsed < best:
+            best = elapsed
+    return best
+
+
+if __name__ == '__main__':
+    # Usage: bench_render.py [runs] [limit]
+    # limit is how many times slower per character the largest input may
+    # render than the smallest, rendering is linear if it stays near 1
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 3
+    limit = float(sys.argv[2]) if len(sys.argv) > 2 else 2.0
+
+    failed = False
+    for font in FONTS:
+        for direction in DIRECTIONS:
+            # Each input is rendered as one band, wide enough to never wrap
+            # and left justified so rows aren't padded out to the width
+            fig = pyfiglet.Figlet(
+                font=font, direction=direction, justify='left',
+                width=max(SIZES) * 100
+            )
+            fig.renderText(SAMPLE)
+
+            perChar = []
+            for size in SIZES:
+                perChar.append(timeRender(fig, sample(size), runs) / size)
+            ratio = perChar[-1] / perChar[0]
+
+            print("%s %s: %s (x%.2f)" % (font, direction, ', '.join(
+                "%dk %.2fus/char" % (size // 1000, t * 1e6)
+                for size, t in zip(SIZES, perChar)), ratio))
+            if ratio > limit:
+                failed = True
+
+    if failed:
+        print("    FAILED")
+        sys.exit(1)
+    print("    Success!")
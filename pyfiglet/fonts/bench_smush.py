@@ -0,0 +1,157 @@
+import os
+import sys
+import time
+
+pth = os.path.dirname(os.path.abspath(sys.argv[0]))
+sys.path.insert(0, os.path.dirname(os.path.dirname(pth)))
+
+import pyfiglet
+
+DIRECTIONS = ('left-to-right', 'right-to-left')
+
+# Widths of the previous and current character, smushing next to a
+# character narrower than 2 columns is only allowed with blanks
+WIDTHS = ((2, 2), (1, 2), (2, 1))
+
+
+class OldEngine(pyfiglet.FigletRenderingEngine):
+    """
+    Smushing as it was done before the pair tables: the rules are walked
+    for every pair, reading the font's options on each call
+    """
+
+    def smushChars(self, ctx, left='', right=''):
+        if left.isspace() is True: return right
+        if right.isspace() is True: return left
+
+        # Disallows overlapping if previous or current char has a width of 1 or zero
+        if (ctx.prevCharWidth < 2) or (ctx.curCharWidth < 2): return
+
+        # kerning only
+        if (ctx.font.smushMode & self.SM_SMUSH) == 0: return
+
+        # smushing by universal overlapping
+        if (ctx.font.smushMode & 63) == 0:
+            # Ensure preference to visiable characters.
+            if left == ctx.font.hardBlank: return right
+            if right == ctx.font.hardBlank: return left
+
+            # Ensures that the dominant (foreground)
+            # fig-character for overlapping is the latter in the
+            # user's text, not necessarily the rightmost character.
+            if ctx.direction == 'right-to-left': return left
+            else: return right
+
+        if ctx.font.smushMode & self.SM_HARDBLANK:
+            if left == ctx.font.hardBlank and right == ctx.font.hardBlank:
+                return left
+
+        if left == ctx.font.hardBlank or right == ctx.font.hardBlank:
+            return
+
+        if ctx.font.smushMode & self.SM_EQUAL:
+            if left == right:
+                return left
+
+        if ctx.font.smushMode & self.SM_LOWLINE:
+            if (left  == '_') and (right in r'|/\[]{}()<>'): return right
+            if (right == '_') and (left  in r'|/\[]{}()<>'): return left
+
+        if ctx.font.smushMode & self.SM_HIERARCHY:
+            if (left  == '|')   and (right in r'|/\[]{}()<>'): return right
+            if (right == '|')   and (left  in r'|/\[]{}()<>'): return left
+            if (left  in r'\/') and (right in '[]{}()<>'): return right
+            if (right in r'\/') and (left  in '[]{}()<>'): return left
+            if (left  in '[]')  and (right in '{}()<>'): return right
+            if (right in '[]')  and (left  in '{}()<>'): return left
+            if (left  in '{}')  and (right in '()<>'): return right
+            if (right in '{}')  and (left  in '()<>'): return left
+            if (left  in '()')  and (right in '<>'): return right
+            if (right in '()')  and (left  in '<>'): return left
+
+        if ctx.font.smushMode & self.SM_PAIR:
+            for pair in [left+right, right+left]:
+                if pair in ['[]', '{}', '()']: return '|'
+
+        if ctx.font.smushMode & self.SM_BIGX:
+            if (left == '/') and (right == '\\'): return '|'
+            if (right == '/') and (left == '\\'): return 'Y'
+            if (left == '>') and (right == '<'): return 'X'
+
+        return
+
+
+def edgePairs(font):
+    """
+    Every (left, right) pair smushing can meet in the font: the right
+    edge of one glyph against the left edge of another
+    """
+    rights = set([font.hardBlank, ' '])
+    lefts = set([font.hardBlank, ' '])
+    for code in font.glyphs:
+        for lgap, lch, rgap, rch in font.getEdges(code):
+            if lch: lefts.add(lch)
+            if rch: rights.add(rch)
+    return [(left, right) for left in sorted(rights) for right in sorted(lefts)]
+
+
+def smushAll(engine, ctx, pairs):
+    """
+    Smush every pair with every combination of widths, returns the
+    results in order
+    """
+    results = []
+    for prevWidth, curWidth in WIDTHS:
+        ctx.prevCharWidth, ctx.curCharWidth = prevWidth, curWidth
+        for left, right in pairs:
+            results.append(engine.smushChars(ctx, left, right))
+    return results
+
+
+if __name__ == '__main__':
+    # Usage: bench_smush.py
+    fonts = []
+    for f in sorted(os.listdir(pth)):
+        if f.lower().endswith((".flf", ".tlf")):
+            fonts.append(f[:-4])
+
+    oldTime = coldTime = newTime = 0.0
+    checked = 0
+    failed = False
+    for font in fonts:
+        try:
+            pairs = edgePairs(pyfiglet.Figlet(font=font).Font)
+        except pyfiglet.FigletError:
+            continue
+
+        for direction in DIRECTIONS:
+            fig = pyfiglet.Figlet(font=font, direction=direction)
+            old = OldEngine(base=fig)
+            ctx = fig.engine.newContext()
+
+            start = time.time()
+            expected = smushAll(old, ctx, pairs)
+            oldTime += time.time() - start
+
+            # The first pass fills the font's table, the second looks up
+            start = time.time()
+            smushAll(fig.engine, ctx, pairs)
+            coldTime += time.time() - start
+            start = time.time()
+            results = smushAll(fig.engine, ctx, pairs)
+            newTime += time.time() - start
+
+            checked += len(results)
+            if results != expected:
+                failed = True
+                print("%s %s: %d of %d pairs differ" % (
+                    font, direction,
+                    len([1 for a, b in zip(results, expected) if a != b]),
+                    len(results)))
+
+    print("Smushed %d pairs from %d fonts: old %.3fs, tables %.3fs (%.3fs filling)" % (
+        checked, len(fonts), oldTime, newTime, coldTime))
+    if failed:
+        print("    FAILED")
+        sys.exit(1)
+    print("    Success!")
@@ -0,0 +1,102 @@
+import os
+import random
+import sys
+import threading
+
+pth = os.path.dirname(os.path.abspath(sys.argv[0]))
+sys.path.insert(0, os.path.dirname(os.path.dirname(pth)))
+
+import pyfiglet
+
+FONTS = ('standard', 'slant', 'big', 'banner3', 'doh')
+OPTIONS = (
+    {},
+    {'direction': 'right-to-left', 'justify': 'right'},
+    {'justify': 'center', 'reverse': True, 'flip': True},
+)
+TEXTS = (
+    'Hello World', 'ASCII Decorator!', 'abc{}[]()<>/\\|_ xyz',
+    'The quick brown fox 0123456789', 'Zz\nmulti line',
+)
+
+
+def reference(font, backend, options):
+    """
+    Render and measure every text on one thread, returns them by text
+    """
+    fig = pyfiglet.Figlet(font=font, backend=backend, **options)
+    results = {}
+    for text in TEXTS:
+        results[text] = (fig.renderText(text), fig.measure(text))
+    return results
+
+
+def hammer(fig, jobs, results):
+    """
+    Render and measure the texts of jobs with a Figlet shared by every
+    thread
+    """
+    for text in jobs:
+        results.append((text, fig.renderText(text), fig.measure(text)))
+
+
+def check(font, backend, options, threads, jobs):
+    """
+    Render with many threads sharing one Figlet, returns the number of
+    results that differ from rendering on a single thread or are missing
+    """
+    expected = reference(font, backend, options)
+
+    # Start from a freshly loaded font, so the threads fill its pair
+    # cache, smush tables and pieces while racing each other
+    pyfiglet.FONT_CACHE.clear()
+    fig = pyfiglet.Figlet(font=font, backend=backend, **options)
+
+    results = []
+    workers = []
+    for i in range(0, threads):
+        texts = [random.choice(TEXTS) for j in range(0, jobs)]
+        workers.append(threading.Thread(target=hammer, args=(fig, texts, results)))
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+
+    # Renders a thread didn't get to because it raised count as well
+    bad = threads * jobs - len(results)
+    for text, output, size in results:
+        if (output, size) != expected[text]:
+            bad += 1
+    return bad
+
+
+if __name__ == '__main__':
+    # Usage: check_threads.py [threads] [renders per thread]
+    threads = int(sys.argv[1]) if len(sys.argv) > 1 else 16
+    jobs = int(sys.argv[2]) if len(sys.argv) > 2 else 25
+
+    # Switch threads as often as possible, to interleave the renders
+    if hasattr(sys, 'setswitchinterval'):
+        sys.setswitchinterval(1e-6)
+    else:
+        sys.setcheckinterval(1)
+
+    backends = ['python']
+    if pyfiglet.NumpyRenderingEngine.available():
+        backends.append('numpy')
+
+    failed = False
+    for backend in backends:
+        for options in OPTIONS:
+            for font in FONTS:
+                bad = check(font, backend, options, threads, jobs)
+                if bad:
+                    failed = True
+                    print("%s %s %r: %d of %d renders differ" % (
+                        backend, font, options, bad, threads * jobs))
+        print("Checked %s rendering with %d threads" % (backend, threads))
+
+    if failed:
+        print("    FAILED")
+        sys.exit(1)
+    print("    Success!")
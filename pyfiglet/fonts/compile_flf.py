@@ -0,0 +1,39 @@
+import os
+import sys
+
+pth = os.path.dirname(os.path.abspath(sys.argv[0]))
+sys.path.insert(0, os.path.dirname(os.path.dirname(pth)))
+
+import pyfiglet
+
+
+class SourceFont(pyfiglet.FigletFont):
+    """
+    Always parse from the FLF source, never from an existing bundle
+    """
+
+    @classmethod
+    def readFont(cls, font, directory):
+        with open(os.path.join(directory, font), 'rb') as f:
+            return font, f.read()
+
+    @classmethod
+    def getBundle(cls, directory):
+        return None
+
+
+if __name__ == '__main__':
+    fonts = []
+    for f in sorted(os.listdir(pth)):
+        file_pth = os.path.join(pth, f)
+        if os.path.isfile(file_pth) and f.lower().endswith((".flf", ".tlf")):
+            try:
+                font = SourceFont(f, pth)
+                fonts.append((f, SourceFont.readFont(f, pth)[1], font))
+            except Exception as e:
+                print("Skipping %s: %s" % (file_pth, e))
+
+    bundle_pth = os.path.join(pth, pyfiglet.BUNDLE_NAME)
+    print("Compiling %d fonts into %s..." % (len(fonts), bundle_pth))
+    pyfiglet.FontBundle.write(bundle_pth, fonts)
+    print("    Success!")
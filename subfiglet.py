@@ -1,6 +1,8 @@
 import sublime
+import json
 import os
-from zipfile import ZipFile, is_zipfile
+import tempfile
+import threading
 
 ST3 = int(sublime.version()) >= 3000
 
@@ -17,61 +19,222 @@ USER_DIR = None
 
 class SublimeFigletFont(pyfiglet.FigletFont):
     def __init__(self, font=pyfiglet.DEFAULT_FONT, directory=DEFAULT_DIR):
-        self.font = font
-        self.comment = ''
-        self.chars = {}
-        self.width = {}
-        self.data = self.preloadFont(font, directory)
-        self.loadFont()
+        pyfiglet.FigletFont.__init__(self, font, directory)
 
     @classmethod
-    def preloadFont(cls, font, directory=DEFAULT_DIR):
+    def getFontPath(cls, font, directory=DEFAULT_DIR):
+        """
+        Locate the font file in the directory.
+        """
+
+        entry = FONT_INDEX.entry(font, directory)
+        if entry is None:
+            raise pyfiglet.FontNotFound("%s doesn't exist" % font)
+        return entry[0]
+
+    @classmethod
+    def getFontMTime(cls, font, directory=DEFAULT_DIR):
+        return os.path.getmtime(cls.getFontPath(font, directory))
+
+    @classmethod
+    def readFont(cls, font, directory=DEFAULT_DIR):
         """
         Load font file into memory. This can be overriden with
         a superclass to create different font sources.
         """
 
-        fontPath = os.path.join(directory, font + '.flf')
-        if not os.path.exists(fontPath):
-            fontPath = os.path.join(directory, font + '.tlf')
-            if not os.path.exists(fontPath):
-                raise pyfiglet.FontNotFound("%s doesn't exist" % font)
-
-        if is_zipfile(fontPath):
-            z = None
-            try:
-                z = ZipFile(fontPath, 'r')
-                data = z.read(z.getinfo(z.infolist()[0].filename))
-                z.close()
-                return data.decode('utf-8', 'replace') if ST3 else data
-            except Exception as e:
-                if z is not None:
-                    z.close()
-                raise pyfiglet.FontError("couldn't read %s: %s" % (fontPath, e))
-        else:
-            try:
-                with open(fontPath, 'rb') as f:
-                    data = f.read()
-                return data.decode('utf-8', 'replace') if ST3 else data
-            except Exception as e:
-                raise pyfiglet.FontError("couldn't open %s: %s" % (fontPath, e))
-
-        raise pyfiglet.FontNotFound(font)
+        fontPath = cls.getFontPath(font, directory)
+        try:
+            with open(fontPath, 'rb') as f:
+                return os.path.basename(fontPath), f.read()
+        except Exception as e:
+            raise pyfiglet.FontError("couldn't open %s: %s" % (fontPath, e))
+
+    @classmethod
+    def streamFont(cls, font, directory=DEFAULT_DIR):
+        fontPath = cls.getFontPath(font, directory)
+        try:
+            return os.path.basename(fontPath), open(fontPath, 'rb')
+        except Exception as e:
+            raise pyfiglet.FontError("couldn't open %s: %s" % (fontPath, e))
+
+    @classmethod
+    def preloadFont(cls, font, directory=DEFAULT_DIR):
+        fn, data = cls.readFont(font, directory)
+        return cls.decodeFont(data, fn)
+
+    @classmethod
+    def getBundle(cls, directory=DEFAULT_DIR):
+        return pyfiglet.FontBundle.open(os.path.join(directory, pyfiglet.BUNDLE_NAME))
 
     @classmethod
     def getFonts(cls, directory=DEFAULT_DIR):
-        return [font[:-4] for font in os.walk(dir).next()[2] if font.endswith(('.flf', '.tlf'))]
+        return sorted(FONT_INDEX.fonts(directory))
+
+
+class FontIndex(object):
+    """
+    Fonts found in the font directories, kept in memory and cached on disk.
+
+    Each directory maps font names to (path, format, zipped, height,
+    smushMode, mtime).  A directory is only listed again when its own
+    modification time changes; fonts that can't be read are left out.
+    """
+
+    VERSION = 1
+
+    def __init__(self, cachePath=None):
+        self.cachePath = cachePath
+        self.directories = None
+        self.lock = threading.Lock()
+
+    def load(self):
+        self.directories = {}
+        if self.cachePath is None or not os.path.exists(self.cachePath):
+            return
+        try:
+            with open(self.cachePath, 'r') as f:
+                cache = json.load(f)
+            if cache.get('version') == self.VERSION:
+                for directory, (mtime, fonts) in cache['directories'].items():
+                    self.directories[directory] = (mtime, dict(
+                        (name, tuple(entry)) for name, entry in fonts.items()
+                    ))
+        except Exception:
+            pass
+
+    def save(self):
+        if self.cachePath is None:
+            return
+        try:
+            with open(self.cachePath, 'w') as f:
+                json.dump({'version': self.VERSION, 'directories': self.directories}, f)
+        except Exception:
+            pass
+
+    @classmethod
+    def readEntry(cls, path):
+        """
+        Read the header of a font file into an index entry
+        """
+
+        from zipfile import is_zipfile
+
+        zipped = is_zipfile(path)
+        with open(path, 'rb') as f:
+            info = SublimeFigletFont.probeStream(f, os.path.basename(path))
+        return (
+            path, path[-3:], zipped, info['height'], info['smushMode'],
+            os.path.getmtime(path)
+        )
+
+    @classmethod
+    def scan(cls, directory):
+        fonts = {}
+        files = [os.path.splitext(fn) for fn in os.listdir(directory)]
+        # .flf files take precedence over .tlf ones of the same name
+        for extension in ('.flf', '.tlf'):
+            for name, ext in files:
+                if ext != extension or name in fonts:
+                    continue
+                path = os.path.join(directory, name + ext)
+                if not os.path.isfile(path):
+                    continue
+                try:
+                    fonts[name] = cls.readEntry(path)
+                except Exception:
+                    pass
+        return fonts
+
+    def fonts(self, directory=DEFAULT_DIR):
+        """
+        Fonts in the directory, name -> (path, format, zipped, height, smushMode, mtime)
+        """
+
+        try:
+            mtime = os.path.getmtime(directory)
+        except OSError:
+            return {}
+
+        with self.lock:
+            if self.directories is None:
+                self.load()
+            entry = self.directories.get(directory)
+            if entry is not None and entry[0] == mtime:
+                return entry[1]
+
+        fonts = self.scan(directory)
+
+        with self.lock:
+            self.directories[directory] = (mtime, fonts)
+            self.save()
+        return fonts
+
+    def entry(self, font, directory=DEFAULT_DIR):
+        """
+        Index entry of the font in the directory, or None if it isn't there.
+        Names that don't match exactly are matched ignoring case, as font
+        files used to be opened by path, which ignores case on Windows
+        and macOS.
+        """
+
+        fonts = self.fonts(directory)
+        entry = fonts.get(font)
+        if entry is None:
+            folded = font.lower()
+            names = [name for name in fonts if name.lower() == folded]
+            if names:
+                entry = fonts[min(names)]
+        return entry
+
+    def find(self, font, directory=None):
+        """
+        Directory the font resides in, or None if it can't be found.
+        An exact match in any directory wins over one ignoring case.
+        """
+
+        locations = figlet_paths() if directory is None else [directory]
+        for loc in locations:
+            if font in self.fonts(loc):
+                return loc
+        for loc in locations:
+            if self.entry(font, loc) is not None:
+                return loc
+        return None
+
+    def listing(self):
+        """
+        Sorted (name, directory) of all fonts in the font directories
+        """
+
+        fonts = []
+        for loc in figlet_paths():
+            fonts.extend((name, loc) for name in self.fonts(loc))
+        fonts.sort()
+        return fonts
+
+
+FONT_INDEX = FontIndex()
+
+# Quick panel previews, kept apart from pyfiglet's render cache so they
+# are bounded by the "preview_prefetch_budget" setting
+PREVIEW_CACHE = pyfiglet.RenderCache()
+pyfiglet.FONT_CACHE.listeners.append(PREVIEW_CACHE.invalidate)
 
 
 class SublimeFiglet(pyfiglet.Figlet):
     def __init__(
         self, font=pyfiglet.DEFAULT_FONT, direction='auto',
-        justify='auto', width=80, directory=DEFAULT_DIR
+        justify='auto', width=80, directory=DEFAULT_DIR,
+        reverse=False, flip=False, renderCache=pyfiglet.RENDER_CACHE
     ):
         self.font = font
         self._direction = direction
         self._justify = justify
         self.width = width
+        self.reverse = reverse
+        self.flip = flip
+        self.renderCache = renderCache
         self.setFont(directory=directory)
         self.engine = pyfiglet.FigletRenderingEngine(base=self)
 
@@ -81,7 +244,8 @@ class SublimeFiglet(pyfiglet.Figlet):
         if 'font' in kwargs:
             self.font = kwargs['font']
 
-        self.Font = SublimeFigletFont(font=self.font, directory=directory)
+        self.location = directory
+        self.Font = pyfiglet.FONT_CACHE.load(SublimeFigletFont, self.font, directory)
 
     def getFonts(self, directory=DEFAULT_DIR):
         return self.Font.getFonts(directory)
@@ -113,6 +277,10 @@ def plugin_loaded():
     if not os.path.exists(USER_DIR):
         USER_DIR = None
 
+    # ST2 has no cache directory, keep the index out of the user's settings
+    cache_dir = sublime.cache_path() if ST3 else tempfile.gettempdir()
+    FONT_INDEX.cachePath = os.path.join(cache_dir, "ASCII Decorator Fonts.json")
+
 
 if not ST3:
     plugin_loaded()